@@ -1,49 +1,150 @@
 """AI agent functions: mistake analysis, parent reports, vocabulary builder,
 and the Study Coach multi-turn agent."""
 
-import dataclasses
+import asyncio
+import contextvars
+import functools
+import heapq
 import json
-from typing import Dict, List, Optional, Tuple
+import logging
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import anthropic
 
 import config
+from database import POOL_MAX_CONNECTIONS
 from models import Answer, Question, Student, TopicMastery
+from response_cache import PromptCache, SemanticCache
 
+try:
+    import orjson
+except ImportError:  # optional speedup — fall back to stdlib json
+    orjson = None
 
-def _call_claude(system_prompt: str, user_prompt: str, max_tokens: int = 2048) -> str:
-    """Make a single Claude API call."""
-    client = anthropic.Anthropic(api_key=config.ANTHROPIC_API_KEY)
-    response = client.messages.create(
-        model=config.MODEL,
-        max_tokens=max_tokens,
-        system=system_prompt,
-        messages=[{"role": "user", "content": user_prompt}],
+logger = logging.getLogger(__name__)
+
+# Vocabulary candidates: words of 3+ letters in an upper-cased stem
+_WORD_RE = re.compile(r"\b[A-Z]{3,}\b")
+
+_PROMPT_CACHE = (
+    PromptCache(config.PROMPT_CACHE_DIR, ttl_seconds=config.PROMPT_CACHE_TTL_SECONDS)
+    if config.PROMPT_CACHE_ENABLED
+    else None
+)
+
+_CLIENT: Optional[anthropic.Anthropic] = None
+
+
+def _get_client() -> anthropic.Anthropic:
+    """Return the shared client so calls reuse its keep-alive connections."""
+    global _CLIENT
+    if _CLIENT is None:
+        _CLIENT = anthropic.Anthropic(api_key=config.ANTHROPIC_API_KEY)
+    return _CLIENT
+
+
+_SEMANTIC_CACHE = (
+    SemanticCache(
+        config.SEMANTIC_CACHE_MODEL,
+        ttl_seconds=config.SEMANTIC_CACHE_TTL_SECONDS,
+        max_entries=config.SEMANTIC_CACHE_MAX_ENTRIES,
     )
-    return response.content[0].text
+    if config.SEMANTIC_CACHE_ENABLED
+    else None
+)
 
 
-def analyze_mistake_patterns(
-    wrong_answers: List[Tuple[Answer, Question]],
-    student: Student,
+def _call_claude(
+    system_prompt: str,
+    user_prompt: str,
+    max_tokens: int = 2048,
+    cache_threshold: Optional[float] = None,
+    model: Optional[str] = None,
 ) -> str:
-    """Analyze patterns in wrong answers and return insights as markdown."""
-    if not wrong_answers:
-        return "No mistakes to analyze yet! Keep practicing."
+    """Make a single Claude API call (defaults to config.ANALYSIS_MODEL).
 
-    # Build context from wrong answers
-    mistakes_text = []
-    for i, (answer, question) in enumerate(wrong_answers[:30], 1):  # cap at 30
-        chosen = answer.selected_answer or "skipped"
-        correct = question.correct_answer
-        chosen_text = question.choices.get(chosen, "N/A") if chosen != "skipped" else "skipped"
-        correct_text = question.choices.get(correct, "")
-
-        mistakes_text.append(
-            f"{i}. [{question.question_type}] {question.stem}\n"
-            f"   Student chose: {chosen}) {chosen_text}\n"
-            f"   Correct: {correct}) {correct_text}"
+    Identical requests are served from the on-disk prompt cache. If the
+    semantic cache is enabled and ``cache_threshold`` is given, a previous
+    response to a sufficiently similar prompt is returned instead.
+    """
+    model = model or config.ANALYSIS_MODEL
+    key = None
+    if _PROMPT_CACHE is not None:
+        key = PromptCache.make_key(model, system_prompt, user_prompt, max_tokens)
+        cached = _PROMPT_CACHE.get(key)
+        if cached is not None:
+            return cached
+
+    def call() -> str:
+        response = _get_client().messages.create(
+            model=model,
+            max_tokens=max_tokens,
+            system=system_prompt,
+            messages=[{"role": "user", "content": user_prompt}],
         )
+        return response.content[0].text
+
+    if _SEMANTIC_CACHE is None or cache_threshold is None:
+        text = call()
+    else:
+        text = _SEMANTIC_CACHE.get_or_call(
+            system_prompt + "\n\n" + user_prompt, cache_threshold, call
+        )
+
+    if key is not None:
+        _PROMPT_CACHE.set(key, text)
+    return text
+
+
+def _format_mistake(i: int, answer: Answer, question: Question) -> str:
+    """Format one wrong answer as a numbered entry for the analysis prompt."""
+    choices = question.choices
+    correct = question.correct_answer
+    chosen = answer.selected_answer
+    if chosen:
+        chosen_line = f"{chosen}) {choices.get(chosen, 'N/A')}"
+    else:
+        chosen_line = "skipped) skipped"
+    return (
+        f"{i}. [{question.question_type}] {question.stem}\n"
+        f"   Student chose: {chosen_line}\n"
+        f"   Correct: {correct}) {choices.get(correct, '')}"
+    )
+
+
+def mastery_view_rows(mastery: List[TopicMastery]) -> List[Dict]:
+    """Per-topic display rows shared by the parent report and Study Coach."""
+    return [
+        {
+            "topic_tag": m.topic_tag,
+            "display": config.display_name(m.topic_tag),
+            "difficulty": m.difficulty_level,
+            "total_attempted": m.total_attempted,
+            "accuracy": (
+                m.total_correct / m.total_attempted if m.total_attempted > 0 else 0
+            ),
+            "last_50_accuracy": (
+                m.last_50_correct / m.last_50_attempted
+                if m.last_50_attempted > 0 else 0
+            ),
+        }
+        for m in mastery
+    ]
+
+
+def _mistake_analysis_prompts(
+    wrong_answers: List[Tuple[Answer, Question]],
+    student: Student,
+) -> Tuple[str, str]:
+    """Build (system_prompt, user_prompt) for mistake pattern analysis."""
+    # Build context from wrong answers (capped at 30)
+    mistakes_text = [
+        _format_mistake(i, answer, question)
+        for i, (answer, question) in enumerate(wrong_answers[:30], 1)
+    ]
 
     system_prompt = (
         f"You are an expert SSAT tutor analyzing a grade {student.grade} student's mistakes. "
@@ -63,26 +164,23 @@ def analyze_mistake_patterns(
         f"(grade {student.grade}, {student.level} level):\n\n"
         + "\n".join(mistakes_text)
     )
-
-    return _call_claude(system_prompt, user_prompt)
+    return system_prompt, user_prompt
 
 
-def generate_parent_report(
+def _parent_report_prompts(
     student: Student,
     stats: Dict,
-    mastery: List[TopicMastery],
+    mastery_view: List[Dict],
     streak_data: Dict,
     recent_session_count: int,
-) -> str:
-    """Generate a parent-friendly progress report."""
+) -> Tuple[str, str]:
+    """Build (system_prompt, user_prompt) for the parent progress report."""
     # Build mastery summary
-    mastery_lines = []
-    for m in mastery:
-        if m.total_attempted < 3:
-            continue
-        acc = m.total_correct / m.total_attempted if m.total_attempted > 0 else 0
-        display = config.QUESTION_TYPE_DISPLAY.get(m.topic_tag, m.topic_tag.title())
-        mastery_lines.append(f"- {display}: {acc:.0%} accuracy ({m.total_attempted} questions)")
+    mastery_lines = [
+        f"- {m['display']}: {m['accuracy']:.0%} accuracy ({m['total_attempted']} questions)"
+        for m in mastery_view
+        if m["total_attempted"] >= 3
+    ]
 
     system_prompt = (
         f"You are writing a brief, warm progress report for the parent of a grade {student.grade} student "
@@ -108,36 +206,30 @@ def generate_parent_report(
         f"Topic Performance:\n"
         + ("\n".join(mastery_lines) if mastery_lines else "- No data yet\n")
     )
-
-    return _call_claude(system_prompt, user_prompt)
+    return system_prompt, user_prompt
 
 
-def build_vocabulary_list(
+def _vocabulary_prompts(
     wrong_verbal: List[Tuple[Answer, Question]],
     grade: int,
-) -> List[Dict]:
-    """Extract vocabulary from missed verbal questions and generate study cards."""
-    if not wrong_verbal:
-        return []
-
+) -> Optional[Tuple[str, str]]:
+    """Build (system_prompt, user_prompt) for vocabulary cards, or None if
+    no words could be extracted from the missed questions."""
     # Extract words from stems
     words = set()
     for answer, question in wrong_verbal[:20]:
-        stem = question.stem.upper()
+        found = _WORD_RE.findall(question.stem.upper())
         # Synonym stems are like "WORD most nearly means"
         if question.question_type == "synonym":
-            parts = stem.split()
-            if parts:
-                words.add(parts[0].strip(".,!?"))
-        # Analogy stems contain word pairs
+            if found:
+                words.add(found[0])
+        # Analogy stems are like "X is to Y as ___ is to ___"; the connectors
+        # are all shorter than three letters
         elif question.question_type == "analogy":
-            for part in stem.replace("IS TO", "|").replace("AS", "|").split("|"):
-                word = part.strip().split()[0] if part.strip() else ""
-                if word and len(word) > 2:
-                    words.add(word)
+            words.update(found)
 
     if not words:
-        return []
+        return None
 
     system_prompt = (
         f"You are a vocabulary tutor for a grade {grade} student. "
@@ -150,25 +242,297 @@ def build_vocabulary_list(
         f"No other text, just the JSON array."
     )
 
-    user_prompt = f"Words to define: {', '.join(sorted(words)[:15])}"
+    user_prompt = f"Words to define: {', '.join(heapq.nsmallest(15, words))}"
+    return system_prompt, user_prompt
+
 
+def _parse_vocabulary(response: str) -> List[Dict]:
+    """Extract the JSON array of vocabulary cards from a Claude response."""
+    start = response.find("[")
+    end = response.rfind("]") + 1
+    if start < 0 or end <= start:
+        logger.warning("Vocabulary response contained no JSON array")
+        return []
     try:
-        response = _call_claude(system_prompt, user_prompt, max_tokens=4096)
-        # Parse JSON from response
-        start = response.find("[")
-        end = response.rfind("]") + 1
-        if start >= 0 and end > start:
-            return json.loads(response[start:end])
-    except Exception:
+        if orjson is not None:
+            return orjson.loads(response[start:end])  # JSONDecodeError is a ValueError
+        return json.loads(response[start:end])
+    except ValueError:
         pass
+    # Stray brackets in trailing prose break the rfind() slice; decode just
+    # the first complete array instead
+    try:
+        cards, _ = json.JSONDecoder().raw_decode(response, start)
+        return cards
+    except ValueError as e:
+        logger.warning("Could not parse vocabulary JSON: %s", e)
+        return []
+
+
+def analyze_mistake_patterns(
+    wrong_answers: List[Tuple[Answer, Question]],
+    student: Student,
+) -> str:
+    """Analyze patterns in wrong answers and return insights as markdown."""
+    if not wrong_answers:
+        return "No mistakes to analyze yet! Keep practicing."
+
+    system_prompt, user_prompt = _mistake_analysis_prompts(wrong_answers, student)
+    return _call_claude(
+        system_prompt, user_prompt,
+        cache_threshold=config.SEMANTIC_THRESHOLD_MISTAKES,
+    )
+
+
+def generate_parent_report(
+    student: Student,
+    stats: Dict,
+    mastery: List[TopicMastery],
+    streak_data: Dict,
+    recent_session_count: int,
+) -> str:
+    """Generate a parent-friendly progress report."""
+    system_prompt, user_prompt = _parent_report_prompts(
+        student, stats, mastery_view_rows(mastery), streak_data, recent_session_count
+    )
+    return _call_claude(
+        system_prompt, user_prompt,
+        cache_threshold=config.SEMANTIC_THRESHOLD_REPORT,
+    )
+
+
+def build_vocabulary_list(
+    wrong_verbal: List[Tuple[Answer, Question]],
+    grade: int,
+) -> List[Dict]:
+    """Extract vocabulary from missed verbal questions and generate study cards."""
+    if not wrong_verbal:
+        return []
+
+    prompts = _vocabulary_prompts(wrong_verbal, grade)
+    if prompts is None:
+        return []
 
-    return []
+    try:
+        response = _call_claude(
+            *prompts, max_tokens=4096,
+            cache_threshold=config.SEMANTIC_THRESHOLD_VOCAB,
+            model=config.COACH_MODEL,
+        )
+    except Exception as e:
+        logger.warning("Vocabulary generation failed: %s", e)
+        return []
+
+    return _parse_vocabulary(response)
+
+
+def generate_parent_reports_bulk(
+    students_with_stats: List[Tuple[Student, Dict, List[TopicMastery], Dict, int]],
+) -> Dict[int, str]:
+    """Generate parent reports for many students via the Message Batches API.
+
+    Each item is (student, stats, mastery, streak_data, recent_session_count),
+    the same arguments generate_parent_report takes. Intended for scheduled
+    runs where results may take up to 24 hours; blocks while polling.
+    Returns {student_id: report_markdown} for the requests that succeeded.
+    """
+    if not students_with_stats:
+        return {}
+
+    requests = []
+    for student, stats, mastery, streak_data, session_count in students_with_stats:
+        system_prompt, user_prompt = _parent_report_prompts(
+            student, stats, mastery_view_rows(mastery), streak_data, session_count
+        )
+        requests.append({
+            "custom_id": f"student_{student.id}",
+            "params": {
+                "model": config.ANALYSIS_MODEL,
+                "max_tokens": 2048,
+                "system": system_prompt,
+                "messages": [{"role": "user", "content": user_prompt}],
+            },
+        })
+
+    client = _get_client()
+    batch = client.messages.batches.create(requests=requests)
+    while batch.processing_status != "ended":
+        time.sleep(config.BATCH_POLL_SECONDS)
+        batch = client.messages.batches.retrieve(batch.id)
+
+    reports = {}
+    for entry in client.messages.batches.results(batch.id):
+        if entry.result.type != "succeeded":
+            continue
+        student_id = int(entry.custom_id.removeprefix("student_"))
+        reports[student_id] = entry.result.message.content[0].text
+    return reports
+
+
+# ---------------------------------------------------------------------------
+# Async variants — fan the three reports out concurrently
+# ---------------------------------------------------------------------------
+
+# Async client for the current gather_all call. A client's connection pool
+# is bound to the event loop it first runs on, and the sync entry points
+# reach gather_all through asyncio.run() (a fresh loop each time), so
+# clients are scoped to one call rather than cached for the process.
+_ASYNC_CLIENT: contextvars.ContextVar[Optional[anthropic.AsyncAnthropic]] = (
+    contextvars.ContextVar("async_client", default=None)
+)
+
+
+def _new_async_client() -> anthropic.AsyncAnthropic:
+    """Create an async client, on aiohttp when the extra is installed."""
+    try:
+        from anthropic import DefaultAioHttpClient
+        http_client = DefaultAioHttpClient()
+    except (ImportError, RuntimeError):
+        # Old anthropic without the class, or installed without the
+        # [aiohttp] extra (the constructor raises RuntimeError then)
+        http_client = None
+    kwargs = {"http_client": http_client} if http_client is not None else {}
+    return anthropic.AsyncAnthropic(api_key=config.ANTHROPIC_API_KEY, **kwargs)
+
+
+async def _call_claude_async(
+    system_prompt: str,
+    user_prompt: str,
+    max_tokens: int = 2048,
+    model: Optional[str] = None,
+) -> str:
+    """Async counterpart of _call_claude. Uses the exact-match prompt cache
+    only; the semantic cache's embedding step is synchronous CPU work."""
+    model = model or config.ANALYSIS_MODEL
+    key = None
+    if _PROMPT_CACHE is not None:
+        key = PromptCache.make_key(model, system_prompt, user_prompt, max_tokens)
+        cached = _PROMPT_CACHE.get(key)
+        if cached is not None:
+            return cached
+
+    request = dict(
+        model=model,
+        max_tokens=max_tokens,
+        system=system_prompt,
+        messages=[{"role": "user", "content": user_prompt}],
+    )
+    client = _ASYNC_CLIENT.get()
+    if client is not None:
+        response = await client.messages.create(**request)
+    else:
+        # Called outside gather_all: use a client for this call only
+        async with _new_async_client() as client:
+            response = await client.messages.create(**request)
+    text = response.content[0].text
+
+    if key is not None:
+        _PROMPT_CACHE.set(key, text)
+    return text
+
+
+async def analyze_mistake_patterns_async(
+    wrong_answers: List[Tuple[Answer, Question]],
+    student: Student,
+) -> str:
+    """Async version of analyze_mistake_patterns."""
+    if not wrong_answers:
+        return "No mistakes to analyze yet! Keep practicing."
+    return await _call_claude_async(*_mistake_analysis_prompts(wrong_answers, student))
+
+
+async def generate_parent_report_async(
+    student: Student,
+    stats: Dict,
+    mastery: List[TopicMastery],
+    streak_data: Dict,
+    recent_session_count: int,
+) -> str:
+    """Async version of generate_parent_report."""
+    return await _call_claude_async(*_parent_report_prompts(
+        student, stats, mastery_view_rows(mastery), streak_data,
+        recent_session_count,
+    ))
+
+
+async def build_vocabulary_list_async(
+    wrong_verbal: List[Tuple[Answer, Question]],
+    grade: int,
+) -> List[Dict]:
+    """Async version of build_vocabulary_list."""
+    if not wrong_verbal:
+        return []
+    prompts = _vocabulary_prompts(wrong_verbal, grade)
+    if prompts is None:
+        return []
+    try:
+        response = await _call_claude_async(
+            *prompts, max_tokens=4096, model=config.COACH_MODEL
+        )
+    except Exception as e:
+        logger.warning("Vocabulary generation failed: %s", e)
+        return []
+    return _parse_vocabulary(response)
+
+
+async def gather_all(
+    student: Student,
+    wrong_answers: List[Tuple[Answer, Question]],
+    stats: Dict,
+    mastery: List[TopicMastery],
+    streak_data: Dict,
+    recent_session_count: int,
+) -> Tuple[str, str, List[Dict]]:
+    """Run mistake analysis, parent report, and vocabulary list concurrently.
+
+    Returns (mistake_analysis, parent_report, vocabulary_cards). Wall-clock
+    time is the slowest of the three calls rather than their sum. The three
+    calls share one async client, closed when this call returns.
+    """
+    wrong_verbal = [
+        (a, q) for a, q in wrong_answers
+        if q.question_type in ("synonym", "analogy")
+    ]
+    async with _new_async_client() as client:
+        # gather() copies the current context into each task
+        token = _ASYNC_CLIENT.set(client)
+        try:
+            analysis, report, vocab = await asyncio.gather(
+                analyze_mistake_patterns_async(wrong_answers, student),
+                generate_parent_report_async(
+                    student, stats, mastery, streak_data, recent_session_count
+                ),
+                build_vocabulary_list_async(wrong_verbal, student.grade),
+            )
+        finally:
+            _ASYNC_CLIENT.reset(token)
+    return analysis, report, vocab
 
 
 # ---------------------------------------------------------------------------
 # Study Coach Agent — multi-turn agentic loop with tool use
 # ---------------------------------------------------------------------------
 
+TOOL_CONCURRENCY = 4  # max tool calls executed in parallel per turn
+# Each concurrent tool call borrows a pooled reader connection, and the pool
+# raises PoolError instead of waiting when it runs out (the writer holds one)
+assert TOOL_CONCURRENCY < POOL_MAX_CONNECTIONS - 1
+TOOL_RESULT_MAX_ITEMS = 15      # list results are trimmed to this many rows
+TOOL_RESULT_MAX_CHARS = 4096    # ...and further if the JSON is still larger
+KEEP_TOOL_RESULT_TURNS = 2      # older tool results are replaced by a summary
+MAX_TOOL_CALLS = 3              # after this many, the next turn must answer
+
+_WRAP_UP_MESSAGE = (
+    "You have gathered sufficient data. Produce the final recommendation "
+    "now without calling more tools."
+)
+
+# Tool results only carry fields the tool descriptions promise Claude
+_COMPACT = (",", ":")
+_SESSION_SCORE_FIELDS = (
+    "total_scaled", "verbal_scaled", "quantitative_scaled", "reading_scaled",
+)
+
 STUDY_COACH_TOOLS = [
     {
         "name": "get_student_stats",
@@ -192,7 +556,7 @@ STUDY_COACH_TOOLS = [
         "name": "get_topic_mastery",
         "description": (
             "Get per-topic accuracy breakdown: topic name, difficulty level, "
-            "total attempted, total correct, and last-50-question accuracy. "
+            "total attempted, overall accuracy, and last-50-question accuracy. "
             "Topics include: synonym, analogy, arithmetic, algebra, geometry, "
             "word_problem, reading_comprehension. "
             "Use this to identify strong and weak areas."
@@ -274,7 +638,8 @@ STUDY_COACH_TOOLS = [
         "name": "get_recent_sessions",
         "description": (
             "Get the student's most recent practice sessions with mode "
-            "(full_test, section_practice, quick_drill), dates, and scores. "
+            "(full_test, section_practice, quick_drill), dates (YYYY-MM-DD), "
+            "and scaled scores where the session was scored. "
             "Use this to understand what types of practice they've been doing "
             "recently and their score trajectory."
         ),
@@ -348,13 +713,24 @@ STUDY_COACH_TOOLS = [
             },
             "required": ["student_id"],
         },
+        # Prompt-cache breakpoint: tool definitions are identical every turn
+        "cache_control": {"type": "ephemeral"},
     },
 ]
 
 
 def _study_coach_system_prompt(student: Student) -> str:
-    """Build the system prompt for the Study Coach agent."""
-    level_config = config.LEVEL_CONFIGS.get(student.level)
+    """Build the system prompt for the Study Coach agent.
+
+    Only the student's level is baked in; name and grade go in the first
+    user message so the prompt-cached prefix is shared across students.
+    """
+    return _coach_prompt_for_level(student.level)
+
+
+@functools.lru_cache(maxsize=8)
+def _coach_prompt_for_level(level: str) -> str:
+    level_config = config.LEVEL_CONFIGS.get(level)
     sections_desc = (
         ", ".join(s.name for s in level_config.sections)
         if level_config
@@ -363,14 +739,13 @@ def _study_coach_system_prompt(student: Student) -> str:
 
     return (
         f"You are Coach, a friendly and encouraging SSAT study coach for "
-        f"{student.name}, a grade {student.grade} student preparing for the "
-        f"SSAT {student.level.title()} Level exam.\n\n"
-        f"SSAT {student.level.title()} Level has these sections: {sections_desc}.\n"
+        f"a student preparing for the SSAT {level.title()} Level exam.\n\n"
+        f"SSAT {level.title()} Level has these sections: {sections_desc}.\n"
         f"Topics tested: Synonyms, Analogies, Arithmetic, "
-        f"{'Algebra, ' if student.level == 'middle' else ''}"
+        f"{'Algebra, ' if level == 'middle' else ''}"
         f"Geometry, Word Problems, Reading Comprehension.\n\n"
         f"YOUR TASK:\n"
-        f"Use the available tools to examine {student.name}'s practice data, "
+        f"Use the available tools to examine the student's practice data, "
         f"then produce a personalized study recommendation for today. "
         f"You must call tools to gather real data — do not make assumptions.\n\n"
         f"INVESTIGATION STRATEGY:\n"
@@ -395,7 +770,7 @@ def _study_coach_system_prompt(student: Student) -> str:
         f"- Be encouraging: always lead with something positive\n"
         f"- Be concrete: recommend specific practice modes (quick drill, "
         f"mini test, section practice, full test)\n"
-        f"- Be age-appropriate: this is a grade {student.grade} student\n"
+        f"- Be age-appropriate for the student's grade\n"
         f"- Keep the entire recommendation under 300 words\n"
         f"- If the student has very little data (< 10 questions), recommend "
         f"starting with a 5-minute mini test to get a baseline\n"
@@ -403,11 +778,71 @@ def _study_coach_system_prompt(student: Student) -> str:
         f"them to get back on track\n"
         f"- NEVER mention tool names, API calls, or technical details in "
         f"your recommendation\n"
-        f"- Do NOT call more tools than necessary — 3-5 tool calls should "
-        f"be sufficient"
+        f"- Do NOT call more tools than necessary — 3 tool calls should "
+        f"be sufficient; request them together where you can"
     )
 
 
+def _json_dumps(obj) -> str:
+    """Compact JSON for tool results. orjson handles dates natively;
+    anything else it can't encode (e.g. Decimal sums) falls back to str()."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str).decode()
+    return json.dumps(obj, default=str, separators=_COMPACT)
+
+
+def _dump_capped(result) -> str:
+    """Serialize a tool result, trimming long lists to keep it near
+    TOOL_RESULT_MAX_CHARS so later turns don't resend huge payloads."""
+    if not isinstance(result, list):
+        return _json_dumps(result)
+
+    limit = min(len(result), TOOL_RESULT_MAX_ITEMS)
+    text = _json_dumps(result[:limit])
+    while len(text) > TOOL_RESULT_MAX_CHARS and limit > 1:
+        limit //= 2
+        text = _json_dumps(result[:limit])
+    if limit == len(result):
+        return text
+    return _json_dumps(
+        {"items": result[:limit], "truncated": True, "total_items": len(result)}
+    )
+
+
+def _compact_old_tool_results(messages: List[Dict]) -> None:
+    """Replace tool results older than the last KEEP_TOOL_RESULT_TURNS turns
+    with a one-line placeholder, in place. Claude has already acted on them,
+    and resending them every turn grows input tokens quadratically."""
+    tool_names = {}
+    result_turns = []
+    for msg in messages:
+        content = msg["content"]
+        if isinstance(content, str):
+            continue
+        if msg["role"] == "assistant":
+            for block in content:
+                if block.type == "tool_use":
+                    tool_names[block.id] = block.name
+        elif content and content[0].get("type") == "tool_result":
+            result_turns.append(content)
+
+    for tool_results in result_turns[:-KEEP_TOOL_RESULT_TURNS]:
+        for item in tool_results:
+            if item.get("type") != "tool_result":
+                continue
+            if item["content"].startswith("[previous tool result"):
+                continue
+            try:
+                data = json.loads(item["content"])
+            except ValueError:
+                data = None
+            if isinstance(data, dict) and "items" in data:
+                data = data["items"]
+            n = len(data) if isinstance(data, list) else 1
+            name = tool_names.get(item["tool_use_id"], "tool")
+            item["content"] = f"[previous tool result — {name} — {n} items, omitted]"
+
+
 def _execute_tool(db, tool_name: str, tool_input: dict) -> str:
     """Execute a Study Coach tool call and return JSON string result."""
     student_id = tool_input["student_id"]
@@ -417,21 +852,16 @@ def _execute_tool(db, tool_name: str, tool_input: dict) -> str:
             result = db.get_student_stats(student_id)
 
         elif tool_name == "get_topic_mastery":
-            mastery_list = db.get_topic_mastery(student_id)
-            result = []
-            for m in mastery_list:
-                d = dataclasses.asdict(m)
-                d["accuracy"] = (
-                    round(m.total_correct / m.total_attempted, 3)
-                    if m.total_attempted > 0
-                    else 0
-                )
-                d["last_50_accuracy"] = (
-                    round(m.last_50_correct / m.last_50_attempted, 3)
-                    if m.last_50_attempted > 0
-                    else 0
-                )
-                result.append(d)
+            result = [
+                {
+                    "topic": m["topic_tag"],
+                    "difficulty": m["difficulty"],
+                    "total_attempted": m["total_attempted"],
+                    "accuracy": round(m["accuracy"], 3),
+                    "last_50_accuracy": round(m["last_50_accuracy"], 3),
+                }
+                for m in mastery_view_rows(db.get_topic_mastery(student_id))
+            ]
 
         elif tool_name == "get_streak_data":
             result = db.get_streak_data(student_id)
@@ -450,7 +880,14 @@ def _execute_tool(db, tool_name: str, tool_input: dict) -> str:
             sessions = db.get_sessions_for_student(
                 student_id, mode=mode, limit=limit
             )
-            result = [dataclasses.asdict(s) for s in sessions]
+            result = []
+            for s in sessions:
+                row = {"mode": s.mode, "date": (s.started_at or "")[:10]}
+                for key in _SESSION_SCORE_FIELDS:
+                    value = getattr(s, key)
+                    if value is not None:
+                        row[key] = value
+                result.append(row)
 
         elif tool_name == "get_wrong_answers":
             limit = tool_input.get("limit", 20)
@@ -495,26 +932,78 @@ def _execute_tool(db, tool_name: str, tool_input: dict) -> str:
                 )
 
         else:
-            return json.dumps({"error": f"Unknown tool: {tool_name}"})
+            return _json_dumps({"error": f"Unknown tool: {tool_name}"})
 
-        return json.dumps(result, default=str)
+        return _dump_capped(result)
 
     except Exception as e:
-        return json.dumps({"error": f"Tool execution failed: {str(e)}"})
+        return _json_dumps({"error": f"Tool execution failed: {str(e)}"})
+
+
+COLD_START_MIN_ANSWERS = 10  # below this the coach returns a canned plan
+
+_COACH_FIRST_TIME = (
+    "Hi {name}! Welcome to SSAT practice — starting is the hardest part, "
+    "and you're already here.\n\n"
+    "**Today's Focus**: Get a baseline. A quick mini test shows where you're "
+    "already strong and what to work on next.\n\n"
+    "**Your Plan**:\n"
+    "1. Take a 5-minute mini test (10 mixed questions)\n"
+    "2. Look over any questions you missed and read the explanations\n\n"
+    "**Quick Win**: Just finishing the mini test earns your first badge!\n\n"
+    "**Streak Status**: Your streak starts today — practice tomorrow to make it 2 days."
+)
+
+_COACH_COLD_START = (
+    "Great start, {name}! You've already answered {count} questions.\n\n"
+    "**Today's Focus**: Finish building your baseline so your plan can be "
+    "tailored to you.\n\n"
+    "**Your Plan**:\n"
+    "1. Take a 5-minute mini test (10 mixed questions)\n"
+    "2. Review any questions you missed\n\n"
+    "**Quick Win**: Try a quick drill on whichever topic felt easiest.\n\n"
+    "**Streak Status**: Practice a little each day to keep your streak growing!"
+)
+
+# Yielded by stream_study_coach when text already streamed turned out to be
+# preamble to a tool call; consumers should clear what they have shown.
+STREAM_RESET = "\f"
 
 
 def run_study_coach(db, student: Student) -> str:
-    """Run the Study Coach agent. Returns markdown study recommendation.
+    """Run the Study Coach agent. Returns markdown study recommendation."""
+    text = ""
+    for chunk in stream_study_coach(db, student):
+        text = "" if chunk == STREAM_RESET else text + chunk
+    return text
+
+
+def stream_study_coach(db, student: Student) -> Iterator[str]:
+    """Run the Study Coach agent, yielding the recommendation as it streams.
 
     This is a multi-turn agentic loop:
     1. Send initial goal message with student context
     2. Claude decides which tools to call
     3. Execute tool calls, feed results back
     4. Repeat until Claude produces a final text response
+
+    Every turn is streamed, since whether it is the final one is only known
+    once it ends. If a turn that already yielded text goes on to call tools,
+    STREAM_RESET is yielded so the caller can discard that preamble.
     """
     MAX_TURNS = 10
 
-    client = anthropic.Anthropic(api_key=config.ANTHROPIC_API_KEY)
+    # Cold start: the prompt's answer for < 10 questions is always a baseline
+    # mini test, so skip the agent loop entirely
+    total_answers = db.get_student_stats(student.id).get("total_answers", 0)
+    if total_answers == 0:
+        yield _COACH_FIRST_TIME.format(name=student.name)
+        return
+    if total_answers < COLD_START_MIN_ANSWERS:
+        yield _COACH_COLD_START.format(name=student.name, count=total_answers)
+        return
+
+    client = _get_client()
     system_prompt = _study_coach_system_prompt(student)
 
     messages = [
@@ -523,6 +1012,7 @@ def run_study_coach(db, student: Student) -> str:
             "content": (
                 f"Please analyze {student.name}'s SSAT practice data and create "
                 f"a personalized study recommendation for today. "
+                f"{student.name} is in grade {student.grade}. "
                 f"Their student_id is {student.id}. "
                 f"Start by checking their overall stats, then dig deeper "
                 f"into areas that need attention."
@@ -530,60 +1020,85 @@ def run_study_coach(db, student: Student) -> str:
         }
     ]
 
+    tool_calls_made = 0
     for turn in range(MAX_TURNS):
-        response = client.messages.create(
-            model=config.MODEL,
-            max_tokens=1500,
-            system=system_prompt,
+        _compact_old_tool_results(messages)
+        # Once enough data is gathered, force the final recommendation
+        # rather than waiting for Claude to stop probing on its own
+        tool_choice = (
+            {"type": "none"} if tool_calls_made >= MAX_TOOL_CALLS
+            else {"type": "auto"}
+        )
+        streamed = False
+        with client.messages.stream(
+            model=config.COACH_MODEL,
+            max_tokens=config.COACH_MAX_TOKENS,
+            system=[
+                {
+                    "type": "text",
+                    "text": system_prompt,
+                    "cache_control": {"type": "ephemeral"},
+                }
+            ],
             tools=STUDY_COACH_TOOLS,
             messages=messages,
-        )
+            tool_choice=tool_choice,
+        ) as stream:
+            for text in stream.text_stream:
+                streamed = True
+                yield text
+            response = stream.get_final_message()
 
         # Final text response — no more tool calls
         if response.stop_reason == "end_turn":
-            text_parts = [
-                block.text
-                for block in response.content
-                if block.type == "text"
-            ]
-            if text_parts:
-                return "\n".join(text_parts)
-            return "I couldn't generate a recommendation. Please try again."
+            if not streamed:
+                yield "I couldn't generate a recommendation. Please try again."
+            return
 
         # Claude wants to call tools
         if response.stop_reason == "tool_use":
+            if streamed:
+                yield STREAM_RESET
+
             # Add Claude's response (with tool_use blocks) to messages
             messages.append(
                 {"role": "assistant", "content": response.content}
             )
 
-            # Execute each tool call and build tool_result blocks
-            tool_results = []
-            for block in response.content:
-                if block.type == "tool_use":
-                    result_str = _execute_tool(db, block.name, block.input)
-                    tool_results.append(
-                        {
-                            "type": "tool_result",
-                            "tool_use_id": block.id,
-                            "content": result_str,
-                        }
-                    )
+            # Tool calls are independent DB reads, so run them concurrently.
+            # Each one borrows its own pooled reader via Database._read();
+            # the pool raises PoolError rather than blocking when exhausted,
+            # hence the TOOL_CONCURRENCY cap. map() keeps tool_use order.
+            tool_blocks = [b for b in response.content if b.type == "tool_use"]
+            tool_calls_made += len(tool_blocks)
+            with ThreadPoolExecutor(max_workers=TOOL_CONCURRENCY) as pool:
+                result_strs = list(pool.map(
+                    lambda b: _execute_tool(db, b.name, b.input),
+                    tool_blocks,
+                ))
+            tool_results = [
+                {
+                    "type": "tool_result",
+                    "tool_use_id": block.id,
+                    "content": result_str,
+                }
+                for block, result_str in zip(tool_blocks, result_strs)
+            ]
+
+            if tool_calls_made >= MAX_TOOL_CALLS:
+                tool_results.append({"type": "text", "text": _WRAP_UP_MESSAGE})
 
             # Feed tool results back as user message
             messages.append({"role": "user", "content": tool_results})
 
         else:
-            # Unexpected stop_reason — extract whatever text we have
-            text_parts = [
-                b.text for b in response.content if b.type == "text"
-            ]
-            if text_parts:
-                return "\n".join(text_parts)
-            return "Study coach encountered an unexpected state."
+            # Unexpected stop_reason — keep whatever text was streamed
+            if not streamed:
+                yield "Study coach encountered an unexpected state."
+            return
 
     # Hit max turns — should never happen in practice
-    return (
+    yield (
         "I gathered a lot of data but ran out of processing steps. "
         "Please try again."
     )
@@ -1,14 +1,124 @@
 #!/usr/bin/env python3
 """SSAT Practice Test — Main entry point and menu system."""
 
+from __future__ import annotations
+
+import argparse
+import importlib
 import sys
+import time
 from datetime import datetime
-from typing import Optional
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
 import config
-from database import Database
-from models import Student
-import display
+
+if TYPE_CHECKING:
+    from database import Database
+    from models import Student
+
+__version__ = "1.0"
+
+# Imported by main() after argument parsing, so --help/--version skip the
+# psycopg2 and rich imports
+display = None
+
+
+# Menu dependencies imported on first use: name -> (module, attribute)
+_LAZY_IMPORTS = {
+    "TestRunner": ("test_runner", "TestRunner"),
+    "QuestionCache": ("question_cache", "QuestionCache"),
+    "QuestionGenerator": ("question_generator", "QuestionGenerator"),
+    "ReviewManager": ("review", "ReviewManager"),
+    "WritingPractice": ("writing", "WritingPractice"),
+    "ProgressTracker": ("progress", "ProgressTracker"),
+}
+
+
+def _lazy(name: str):
+    """Import a menu dependency once and cache it as a module global."""
+    obj = globals().get(name)
+    if obj is None:
+        module, attr = _LAZY_IMPORTS[name]
+        obj = getattr(importlib.import_module(module), attr)
+        globals()[name] = obj
+    return obj
+
+
+def __getattr__(name: str):
+    # PEP 562: app.TestRunner etc. resolve lazily for external callers too
+    if name in _LAZY_IMPORTS:
+        return _lazy(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Created on first use and shared across menu iterations
+_GENERATOR = None
+_CACHE = None
+
+
+def _get_generator():
+    """Return the shared QuestionGenerator, importing it on first use."""
+    global _GENERATOR
+    if _GENERATOR is None:
+        _GENERATOR = _lazy("QuestionGenerator")()
+    return _GENERATOR
+
+
+def _get_cache(db: Database):
+    """Return the shared QuestionCache bound to ``db``."""
+    global _CACHE
+    if _CACHE is None or _CACHE.db is not db:
+        _CACHE = _lazy("QuestionCache")(db, _get_generator())
+    return _CACHE
+
+
+# Pool stats by (student_id, level) -> (monotonic timestamp, stats)
+POOL_STATS_TTL_SECONDS = 5.0
+_POOL_STATS: Dict[Tuple[int, str], Tuple[float, Dict[str, int]]] = {}
+
+
+def _get_pool_stats(db: Database, student: Student) -> Dict[str, int]:
+    """Unseen-question counts per type, reused for a few seconds."""
+    key = (student.id, student.level)
+    now = time.monotonic()
+    cached = _POOL_STATS.get(key)
+    if cached and now - cached[0] < POOL_STATS_TTL_SECONDS:
+        return cached[1]
+    stats = _get_cache(db).get_pool_stats(student.id, student.level)
+    _POOL_STATS[key] = (now, stats)
+    return stats
+
+
+def _invalidate_pool_stats(student: Student) -> None:
+    """Drop cached pool stats after questions are generated or answered."""
+    for key in [k for k in _POOL_STATS if k[0] == student.id]:
+        del _POOL_STATS[key]
+
+
+_MAIN_MENU_OPTIONS = (
+    "Start Practice Test (Full)",
+    "Section Practice",
+    "Quick Drill (10-20 questions)",
+    "Review Missed Questions",
+    "Writing Practice",
+    "View Progress & Scores",
+    "Switch Profile",
+    "Settings",
+    "Exit",
+)
+
+# Settings entries after the three that show current state
+_SETTINGS_MENU_STATIC = (
+    "Pre-generate question pool",
+    "View question pool stats",
+    "Reset progress (caution!)",
+    "Back to main menu",
+)
+
+_LEVEL_MENU_OPTIONS = (
+    "Elementary Level (Grades 3-4)",
+    "Middle Level (Grades 5-7)",
+)
 
 
 def check_api_key() -> bool:
@@ -74,10 +184,7 @@ def settings_menu(db: Database, student: Student) -> Student:
             f"Timer: {'ON' if config.TIMER_ENABLED else 'OFF'}",
             f"Adjust grade level (currently {student.grade})",
             f"Adjust test level (currently {student.level.title()})",
-            "Pre-generate question pool",
-            "View question pool stats",
-            "Reset progress (caution!)",
-            "Back to main menu",
+            *_SETTINGS_MENU_STATIC,
         ]
 
         choice = display.show_menu("Settings", options)
@@ -98,31 +205,23 @@ def settings_menu(db: Database, student: Student) -> Student:
             display.show_success(f"Grade updated to {new_grade} ({student.level.title()} Level)")
 
         elif choice == 3:
-            level_choice = display.show_menu("Select Level", [
-                "Elementary Level (Grades 3-4)",
-                "Middle Level (Grades 5-7)",
-            ])
+            level_choice = display.show_menu("Select Level", _LEVEL_MENU_OPTIONS)
             student.level = "elementary" if level_choice == 1 else "middle"
             db.update_student(student)
             display.show_success(f"Level updated to {student.level.title()}")
 
         elif choice == 4:
             try:
-                from question_generator import QuestionGenerator
-                from question_cache import QuestionCache
-                generator = QuestionGenerator()
-                cache = QuestionCache(db, generator)
+                cache = _get_cache(db)
                 cache.generate_batch_interactive(student)
             except Exception as e:
                 display.show_error(f"Failed to generate questions: {e}")
+            finally:
+                _invalidate_pool_stats(student)
 
         elif choice == 5:
             try:
-                from question_cache import QuestionCache
-                from question_generator import QuestionGenerator
-                generator = QuestionGenerator()
-                cache = QuestionCache(db, generator)
-                stats = cache.get_pool_stats(student.id, student.level)
+                stats = _get_pool_stats(db, student)
                 display.show_pool_stats(stats)
             except Exception as e:
                 display.show_error(f"Failed to get pool stats: {e}")
@@ -132,6 +231,7 @@ def settings_menu(db: Database, student: Student) -> Student:
             if display.confirm("This will delete ALL progress for this student. Are you sure?"):
                 if display.confirm("This CANNOT be undone. Really delete?"):
                     _reset_student_progress(db, student)
+                    _invalidate_pool_stats(student)
                     display.show_success("Progress has been reset.")
 
         elif choice == 7:
@@ -141,83 +241,48 @@ def settings_menu(db: Database, student: Student) -> Student:
 
 
 def _reset_student_progress(db: Database, student: Student) -> None:
-    """Delete all answers, sessions, mastery, and writing samples for a student."""
-    db.conn.execute("DELETE FROM answers WHERE student_id = ?", (student.id,))
-    db.conn.execute("DELETE FROM test_sessions WHERE student_id = ?", (student.id,))
-    db.conn.execute("DELETE FROM topic_mastery WHERE student_id = ?", (student.id,))
-    db.conn.execute("DELETE FROM writing_samples WHERE student_id = ?", (student.id,))
-    db.conn.commit()
+    """Delete all progress data for a student."""
+    db.reset_student_progress(student.id)
 
 
 def main_menu_loop(db: Database, student: Student) -> None:
     """Main menu loop."""
+    runner = None  # shared by choices 1-3 until the profile changes
     while True:
         display.clear_screen()
         display.show_banner()
         display.show_info(f"Student: {student.name} | Grade {student.grade} | {student.level.title()} Level")
         display.console.print()
 
-        options = [
-            "Start Practice Test (Full)",
-            "Section Practice",
-            "Quick Drill (10-20 questions)",
-            "Review Missed Questions",
-            "Writing Practice",
-            "View Progress & Scores",
-            "Switch Profile",
-            "Settings",
-            "Exit",
-        ]
-
-        choice = display.show_menu("Main Menu", options)
+        choice = display.show_menu("Main Menu", _MAIN_MENU_OPTIONS)
 
         try:
-            if choice == 1:
-                from test_runner import TestRunner
-                from question_cache import QuestionCache
-                from question_generator import QuestionGenerator
-                generator = QuestionGenerator()
-                cache = QuestionCache(db, generator)
-                runner = TestRunner(db, cache, student)
-                runner.run_full_test()
-
-            elif choice == 2:
-                from test_runner import TestRunner
-                from question_cache import QuestionCache
-                from question_generator import QuestionGenerator
-                generator = QuestionGenerator()
-                cache = QuestionCache(db, generator)
-                runner = TestRunner(db, cache, student)
-                runner.run_section_practice()
-
-            elif choice == 3:
-                from test_runner import TestRunner
-                from question_cache import QuestionCache
-                from question_generator import QuestionGenerator
-                generator = QuestionGenerator()
-                cache = QuestionCache(db, generator)
-                runner = TestRunner(db, cache, student)
-                runner.run_quick_drill()
+            if choice in (1, 2, 3):
+                if runner is None or runner.student is not student:
+                    runner = _lazy("TestRunner")(db, _get_cache(db), student)
+                try:
+                    if choice == 1:
+                        runner.run_full_test()
+                    elif choice == 2:
+                        runner.run_section_practice()
+                    else:
+                        runner.run_quick_drill()
+                finally:
+                    _invalidate_pool_stats(student)
 
             elif choice == 4:
-                from review import ReviewManager
-                from question_cache import QuestionCache
-                from question_generator import QuestionGenerator
-                generator = QuestionGenerator()
-                cache = QuestionCache(db, generator)
-                reviewer = ReviewManager(db, cache, student)
-                reviewer.run_review()
+                reviewer = _lazy("ReviewManager")(db, _get_cache(db), student)
+                try:
+                    reviewer.run_review()
+                finally:
+                    _invalidate_pool_stats(student)
 
             elif choice == 5:
-                from writing import WritingPractice
-                from question_generator import QuestionGenerator
-                generator = QuestionGenerator()
-                wp = WritingPractice(db, generator, student)
+                wp = _lazy("WritingPractice")(db, _get_generator(), student)
                 wp.run_writing_practice()
 
             elif choice == 6:
-                from progress import ProgressTracker
-                tracker = ProgressTracker(db, student)
+                tracker = _lazy("ProgressTracker")(db, student)
                 tracker.show_dashboard()
                 display.press_enter_to_continue()
 
@@ -242,8 +307,20 @@ def main_menu_loop(db: Database, student: Student) -> None:
             display.press_enter_to_continue()
 
 
-def main() -> None:
+def _parse_args(argv: Optional[List[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="SSAT practice tests in the terminal.")
+    parser.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
     """Entry point."""
+    _parse_args(argv)
+
+    global display
+    import display
+    from database import Database
+
     display.clear_screen()
     display.show_banner()
 
@@ -258,8 +335,14 @@ def main() -> None:
     if not db_url:
         display.show_error("SUPABASE_DB_URL not configured. Set it in .env or environment.")
         sys.exit(1)
-    db = Database(db_url)
+    db = Database(
+        db_url,
+        prepare_statements=config.DB_PREPARE_STATEMENTS,
+        async_commit=config.DB_ASYNC_COMMIT,
+    )
     db.initialize()
+    if config.DB_DEBUG_EXPLAIN:
+        db.check_query_plans()
 
     try:
         # Select or create profile
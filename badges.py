@@ -1,91 +1,120 @@
 """Badge definitions and check logic for gamification."""
 
 from dataclasses import dataclass
-from typing import Callable, Dict, List, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
+# Topics that count toward the Math Whiz / Word Master badges
+MATH_TOPICS = ("arithmetic", "algebra", "geometry", "word_problem")
+VERBAL_TOPICS = ("synonym", "analogy")
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class BadgeDef:
     name: str
     description: str
     icon: str
-    check: Callable[[Dict], bool]
-
-
-def _check_first_steps(stats: Dict) -> bool:
-    return stats.get("total_answers", 0) >= 1
-
-
-def _check_streak_3(stats: Dict) -> bool:
-    return stats.get("streak", 0) >= 3
-
-
-def _check_streak_7(stats: Dict) -> bool:
-    return stats.get("streak", 0) >= 7
+    # Declarative predicate: (op, *args), evaluated by _eval_spec. e.g.
+    #   ("ge", "total_answers", 100)
+    #   ("topic_any", MATH_TOPICS, 20, 0.85)  -> min questions, min accuracy
+    #   ("truthy", "mini_test_perfect")
+    spec: Tuple
 
+    @property
+    def deps(self) -> Tuple[str, ...]:
+        """Stats keys this badge's predicate reads."""
+        if self.spec[0] == "topic_any":
+            return ("topic_accuracy",)
+        return (self.spec[1],)
 
-def _check_streak_14(stats: Dict) -> bool:
-    return stats.get("streak", 0) >= 14
 
+def _ge(stats: Dict, key: str, threshold) -> bool:
+    return stats.get(key, 0) >= threshold
 
-def _check_century(stats: Dict) -> bool:
-    return stats.get("total_answers", 0) >= 100
 
+def _truthy(stats: Dict, key: str) -> bool:
+    return bool(stats.get(key, False))
 
-def _check_500_club(stats: Dict) -> bool:
-    return stats.get("total_answers", 0) >= 500
 
-
-def _check_math_whiz(stats: Dict) -> bool:
-    math_topics = stats.get("topic_accuracy", {})
-    for topic in ["arithmetic", "algebra", "geometry", "word_problem"]:
-        acc = math_topics.get(topic, {})
-        if acc.get("total", 0) >= 20 and acc.get("accuracy", 0) >= 0.85:
+def _topic_any(stats: Dict, topics: Tuple[str, ...], min_total: int, min_accuracy: float) -> bool:
+    topic_accuracy = stats.get("topic_accuracy", {})
+    for topic in topics:
+        acc = topic_accuracy.get(topic)
+        if acc and acc.get("total", 0) >= min_total and acc.get("accuracy", 0) >= min_accuracy:
             return True
     return False
 
 
-def _check_word_master(stats: Dict) -> bool:
-    topics = stats.get("topic_accuracy", {})
-    for topic in ["synonym", "analogy"]:
-        acc = topics.get(topic, {})
-        if acc.get("total", 0) >= 20 and acc.get("accuracy", 0) >= 0.85:
-            return True
-    return False
-
-
-def _check_speed_demon(stats: Dict) -> bool:
-    return stats.get("mini_test_time_to_spare", 0) >= 120
-
-
-def _check_perfect_10(stats: Dict) -> bool:
-    return stats.get("mini_test_perfect", False)
+_SPEC_OPS: Dict[str, Callable[..., bool]] = {
+    "ge": _ge,
+    "truthy": _truthy,
+    "topic_any": _topic_any,
+}
 
 
-def _check_double_checker(stats: Dict) -> bool:
-    return stats.get("total_changed_answers", 0) >= 5
+def _eval_spec(spec: Tuple, stats: Dict) -> bool:
+    op, *args = spec
+    return _SPEC_OPS[op](stats, *args)
 
 
 BADGE_DEFINITIONS: List[BadgeDef] = [
-    BadgeDef("First Steps", "Complete your first practice session", "🎯", _check_first_steps),
-    BadgeDef("3-Day Streak", "Practice 3 days in a row", "🔥", _check_streak_3),
-    BadgeDef("Week Warrior", "Practice 7 days in a row", "⚡", _check_streak_7),
-    BadgeDef("Two-Week Titan", "Practice 14 days in a row", "💪", _check_streak_14),
-    BadgeDef("Century Club", "Answer 100 questions", "💯", _check_century),
-    BadgeDef("500 Club", "Answer 500 questions", "🏆", _check_500_club),
-    BadgeDef("Math Whiz", "85%+ accuracy on 20+ math questions", "🔢", _check_math_whiz),
-    BadgeDef("Word Master", "85%+ accuracy on 20+ verbal questions", "📚", _check_word_master),
-    BadgeDef("Speed Demon", "Finish a mini test with 2+ minutes to spare", "⏱️", _check_speed_demon),
-    BadgeDef("Perfect 10", "Score 10/10 on a mini test", "🌟", _check_perfect_10),
-    BadgeDef("Double Checker", "Change 5+ answers after being nudged", "🔍", _check_double_checker),
+    BadgeDef("First Steps", "Complete your first practice session", "🎯", ("ge", "total_answers", 1)),
+    BadgeDef("3-Day Streak", "Practice 3 days in a row", "🔥", ("ge", "streak", 3)),
+    BadgeDef("Week Warrior", "Practice 7 days in a row", "⚡", ("ge", "streak", 7)),
+    BadgeDef("Two-Week Titan", "Practice 14 days in a row", "💪", ("ge", "streak", 14)),
+    BadgeDef("Century Club", "Answer 100 questions", "💯", ("ge", "total_answers", 100)),
+    BadgeDef("500 Club", "Answer 500 questions", "🏆", ("ge", "total_answers", 500)),
+    BadgeDef("Math Whiz", "85%+ accuracy on 20+ math questions", "🔢", ("topic_any", MATH_TOPICS, 20, 0.85)),
+    BadgeDef("Word Master", "85%+ accuracy on 20+ verbal questions", "📚", ("topic_any", VERBAL_TOPICS, 20, 0.85)),
+    BadgeDef("Speed Demon", "Finish a mini test with 2+ minutes to spare", "⏱️", ("ge", "mini_test_time_to_spare", 120)),
+    BadgeDef("Perfect 10", "Score 10/10 on a mini test", "🌟", ("truthy", "mini_test_perfect")),
+    BadgeDef("Double Checker", "Change 5+ answers after being nudged", "🔍", ("ge", "total_changed_answers", 5)),
 ]
 
 
-def check_new_badges(stats: Dict, existing_badge_names: List[str]) -> List[BadgeDef]:
-    """Check all badge definitions and return any newly earned badges."""
-    new_badges = []
-    for badge in BADGE_DEFINITIONS:
-        if badge.name not in existing_badge_names:
-            if badge.check(stats):
-                new_badges.append(badge)
-    return new_badges
+# Stats key -> badges whose predicate reads it
+_BADGES_BY_DEP: Dict[str, List[BadgeDef]] = {}
+for _badge in BADGE_DEFINITIONS:
+    for _dep in _badge.deps:
+        _BADGES_BY_DEP.setdefault(_dep, []).append(_badge)
+
+# Threshold badges grouped by the stat they compare, lowest threshold first,
+# so each family reads its stat once and stops at the first unmet rung
+_GE_LADDERS: Dict[str, List[BadgeDef]] = {}
+for _badge in BADGE_DEFINITIONS:
+    if _badge.spec[0] == "ge":
+        _GE_LADDERS.setdefault(_badge.spec[1], []).append(_badge)
+for _ladder in _GE_LADDERS.values():
+    _ladder.sort(key=lambda b: b.spec[2])
+del _badge, _dep, _ladder
+
+
+def check_new_badges(
+    stats: Dict,
+    existing_badge_names: List[str],
+    changed_keys: Optional[Iterable[str]] = None,
+) -> List[BadgeDef]:
+    """Check badge definitions and return any newly earned badges.
+
+    When ``changed_keys`` is given, only badges that read one of those stats
+    keys are evaluated; the rest cannot have changed state.
+    """
+    if changed_keys is None:
+        candidates = BADGE_DEFINITIONS
+    else:
+        wanted = {b for key in changed_keys for b in _BADGES_BY_DEP.get(key, ())}
+        candidates = [b for b in BADGE_DEFINITIONS if b in wanted]
+    existing = frozenset(existing_badge_names)
+    pending = [b for b in candidates if b.name not in existing]
+
+    passed = set()
+    for key in {b.spec[1] for b in pending if b.spec[0] == "ge"}:
+        value = stats.get(key, 0)
+        for badge in _GE_LADDERS[key]:
+            if value < badge.spec[2]:
+                break
+            passed.add(badge)
+
+    return [
+        badge for badge in pending
+        if (badge in passed if badge.spec[0] == "ge" else _eval_spec(badge.spec, stats))
+    ]
@@ -1,6 +1,8 @@
 import os
+import sys
 from pathlib import Path
 from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Dict, List
 
 from dotenv import load_dotenv
@@ -12,14 +14,28 @@ load_dotenv(Path(__file__).parent / ".env")
 # ---------------------------------------------------------------------------
 # Helper: read from Streamlit secrets if available, else os.getenv
 # ---------------------------------------------------------------------------
+def _load_streamlit_secrets() -> Dict[str, str]:
+    """Read st.secrets once; empty outside a Streamlit process (e.g. the CLI)."""
+    if os.getenv("SSAT_DISABLE_STREAMLIT_SECRETS", "").lower() in ("1", "true"):
+        return {}
+    # Only consult secrets if `streamlit run` already imported it — never pay
+    # for the streamlit import just to look up keys from the CLI
+    st = sys.modules.get("streamlit")
+    if st is None or not hasattr(st, "secrets"):
+        return {}
+    try:
+        return {key: str(value) for key, value in st.secrets.items()}
+    except Exception:
+        return {}  # no secrets.toml
+
+
+_STREAMLIT_SECRETS: Dict[str, str] = _load_streamlit_secrets()
+
+
 def _get_secret(key: str, default: str = "") -> str:
     """Try st.secrets first (Streamlit Cloud), then env vars."""
-    try:
-        import streamlit as st
-        if hasattr(st, "secrets") and key in st.secrets:
-            return str(st.secrets[key])
-    except (ImportError, Exception):
-        pass
+    if key in _STREAMLIT_SECRETS:
+        return _STREAMLIT_SECRETS[key]
     return os.getenv(key, default)
 
 
@@ -29,9 +45,16 @@ def _get_secret(key: str, default: str = "") -> str:
 ANTHROPIC_API_KEY: str = _get_secret("ANTHROPIC_API_KEY", "")
 SUPABASE_DB_URL: str = _get_secret("SUPABASE_DB_URL", "")
 DB_PATH: str = _get_secret("SSAT_DB_PATH", str(Path(__file__).parent / "ssat_practice.db"))
+DB_PREPARE_STATEMENTS: bool = _get_secret("SSAT_DB_PREPARE_STATEMENTS", "false").lower() == "true"
+DB_ASYNC_COMMIT: bool = _get_secret("SSAT_DB_ASYNC_COMMIT", "false").lower() == "true"
+DB_DEBUG_EXPLAIN: bool = _get_secret("SSAT_DEBUG_EXPLAIN", "false").lower() == "true"
 MODEL: str = _get_secret("SSAT_MODEL", "claude-sonnet-4-5-20250929")
+ANALYSIS_MODEL: str = _get_secret("SSAT_ANALYSIS_MODEL", MODEL)      # mistake analysis, parent reports
+COACH_MODEL: str = _get_secret("SSAT_COACH_MODEL", "claude-haiku-4-5")  # Study Coach, vocabulary cards
 TIMER_ENABLED: bool = _get_secret("SSAT_TIMER_ENABLED", "true").lower() == "true"
 QUESTIONS_PER_BATCH: int = int(_get_secret("SSAT_QUESTIONS_PER_BATCH", "25"))
+PROMPT_CACHE_ENABLED: bool = _get_secret("SSAT_PROMPT_CACHE_ENABLED", "true").lower() == "true"
+SEMANTIC_CACHE_ENABLED: bool = _get_secret("SSAT_SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
 
 # ---------------------------------------------------------------------------
 # SSAT test structure constants
@@ -107,6 +130,12 @@ QUESTION_TYPE_DISPLAY = {
     "reading_comprehension": "Reading Comprehension",
 }
 
+
+@lru_cache(maxsize=64)
+def display_name(tag: str) -> str:
+    """User-friendly name for a question type or topic tag."""
+    return QUESTION_TYPE_DISPLAY.get(tag, tag.title())
+
 # Topics available for quick drills, grouped by category
 DRILL_TOPICS = {
     "Math": ["arithmetic", "algebra", "geometry", "word_problem"],
@@ -118,10 +147,29 @@ DRILL_TOPICS = {
 # Question generation
 # ---------------------------------------------------------------------------
 MIN_POOL_SIZE = 10           # auto-replenish when unseen < this
-RATE_LIMIT_SECONDS = 1.0     # min delay between API calls
+RATE_LIMIT_SECONDS = 1.0     # min delay between API call starts
+GENERATION_WORKERS = 4       # question types generated concurrently
 MAX_RETRIES = 3              # retries on transient API errors
 MAX_TOKENS = 8192            # max tokens for question generation response
 
+# ---------------------------------------------------------------------------
+# Study Coach
+# ---------------------------------------------------------------------------
+COACH_MAX_TOKENS = 600       # the recommendation is capped at ~300 words
+BATCH_POLL_SECONDS = 60      # Message Batches status poll interval for bulk reports
+
+# ---------------------------------------------------------------------------
+# AI agent response caching
+# ---------------------------------------------------------------------------
+PROMPT_CACHE_DIR = Path(__file__).parent / ".cache" / "claude"
+PROMPT_CACHE_TTL_SECONDS = 24 * 3600         # exact-match entries expire after 24h
+SEMANTIC_CACHE_MODEL = "all-MiniLM-L6-v2"   # local sentence-transformers model
+SEMANTIC_CACHE_TTL_SECONDS = 7 * 24 * 3600   # cached responses expire after 7 days
+SEMANTIC_CACHE_MAX_ENTRIES = 512             # LRU eviction beyond this
+SEMANTIC_THRESHOLD_MISTAKES = 0.98           # student-specific, so match strictly
+SEMANTIC_THRESHOLD_REPORT = 0.95
+SEMANTIC_THRESHOLD_VOCAB = 0.95
+
 # ---------------------------------------------------------------------------
 # Mastery / leveling
 # ---------------------------------------------------------------------------
@@ -1,9 +1,19 @@
+import io
 import json
-from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 
 import psycopg2
 import psycopg2.extras
+import psycopg2.pool
+
+try:
+    import orjson
+except ImportError:  # optional speedup — fall back to stdlib json
+    orjson = None
 
 from models import (
     Answer,
@@ -14,6 +24,8 @@ from models import (
     WritingSample,
 )
 
+logger = logging.getLogger(__name__)
+
 SCHEMA_STATEMENTS = [
     """CREATE TABLE IF NOT EXISTS students (
         id SERIAL PRIMARY KEY,
@@ -49,7 +61,7 @@ SCHEMA_STATEMENTS = [
         difficulty INTEGER DEFAULT 3,
         stem TEXT NOT NULL,
         passage TEXT,
-        choices TEXT NOT NULL,
+        choices JSONB NOT NULL,
         correct_answer TEXT NOT NULL,
         explanation TEXT DEFAULT '',
         generated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -105,18 +117,454 @@ SCHEMA_STATEMENTS = [
         last_reviewed TIMESTAMP,
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
     )""",
+    # Migrate databases created when choices was TEXT
+    """DO $$
+    BEGIN
+        IF EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = 'questions'
+              AND column_name = 'choices' AND data_type = 'text'
+        ) THEN
+            ALTER TABLE questions ALTER COLUMN choices TYPE JSONB USING choices::jsonb;
+        END IF;
+    END $$""",
+    # Normalized stem hash for server-side duplicate checks (find_existing_stems)
+    """ALTER TABLE questions ADD COLUMN IF NOT EXISTS stem_hash BIGINT
+       GENERATED ALWAYS AS (hashtextextended(lower(btrim(stem)), 0)) STORED""",
+    "CREATE INDEX IF NOT EXISTS idx_q_stem_hash ON questions (stem_hash)",
+    # Correctness of each topic's last 50 answers as a bitmap, newest in bit 0,
+    # so the leveling engine can slide the window without re-reading answers
+    "ALTER TABLE topic_mastery ADD COLUMN IF NOT EXISTS last_50_bits BIGINT",
+    # Backfill records written before the bitmap existed
+    """UPDATE topic_mastery m SET last_50_bits = (
+           SELECT COALESCE(bit_or(CASE WHEN w.is_correct THEN 1::bigint ELSE 0 END
+                                  << (w.rn - 1)::int), 0)
+           FROM (
+               SELECT a.is_correct,
+                      row_number() OVER (ORDER BY a.answered_at DESC) AS rn
+               FROM answers a
+               JOIN questions q ON a.question_id = q.id
+               WHERE a.student_id = m.student_id
+                 AND (q.question_type = m.topic_tag OR q.topic = m.topic_tag)
+               ORDER BY a.answered_at DESC
+               LIMIT 50
+           ) w
+       )
+       WHERE m.last_50_bits IS NULL""",
+    # Per-student, per-day answer totals for the dashboard, kept current by a
+    # statement-level trigger on answers (see get_daily_activity)
+    """CREATE TABLE IF NOT EXISTS answers_daily (
+        student_id INTEGER NOT NULL REFERENCES students(id),
+        day DATE NOT NULL,
+        total INTEGER NOT NULL DEFAULT 0,
+        correct INTEGER NOT NULL DEFAULT 0,
+        skipped INTEGER NOT NULL DEFAULT 0,
+        total_time REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (student_id, day)
+    )""",
+    """CREATE OR REPLACE FUNCTION answers_daily_add() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO answers_daily AS d (student_id, day, total, correct, skipped, total_time)
+        SELECT student_id, DATE(answered_at), COUNT(*),
+               COUNT(*) FILTER (WHERE is_correct),
+               COUNT(*) FILTER (WHERE selected_answer IS NULL),
+               COALESCE(SUM(time_spent_seconds), 0)
+        FROM new_answers
+        WHERE answered_at IS NOT NULL
+        GROUP BY student_id, DATE(answered_at)
+        ON CONFLICT (student_id, day) DO UPDATE SET
+            total = d.total + EXCLUDED.total,
+            correct = d.correct + EXCLUDED.correct,
+            skipped = d.skipped + EXCLUDED.skipped,
+            total_time = d.total_time + EXCLUDED.total_time;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql""",
+    """DO $$
+    BEGIN
+        IF NOT EXISTS (
+            SELECT 1 FROM pg_trigger
+            WHERE tgname = 'answers_daily_add' AND tgrelid = 'answers'::regclass
+        ) THEN
+            CREATE TRIGGER answers_daily_add AFTER INSERT ON answers
+                REFERENCING NEW TABLE AS new_answers
+                FOR EACH STATEMENT EXECUTE FUNCTION answers_daily_add();
+        END IF;
+    END $$""",
+    # Backfill once for answers recorded before the summary table existed
+    """INSERT INTO answers_daily (student_id, day, total, correct, skipped, total_time)
+       SELECT student_id, DATE(answered_at), COUNT(*),
+              COUNT(*) FILTER (WHERE is_correct),
+              COUNT(*) FILTER (WHERE selected_answer IS NULL),
+              COALESCE(SUM(time_spent_seconds), 0)
+       FROM answers
+       WHERE answered_at IS NOT NULL
+         AND NOT EXISTS (SELECT 1 FROM answers_daily)
+       GROUP BY student_id, DATE(answered_at)""",
+    # Per-student wrong-answer counts per question, kept current the same way
+    # (see get_frequently_missed_questions)
+    """CREATE TABLE IF NOT EXISTS question_miss_counts (
+        student_id INTEGER NOT NULL REFERENCES students(id),
+        question_id INTEGER NOT NULL REFERENCES questions(id),
+        wrong_count INTEGER NOT NULL DEFAULT 0,
+        last_wrong_at TIMESTAMP,
+        PRIMARY KEY (student_id, question_id)
+    )""",
+    """CREATE OR REPLACE FUNCTION question_miss_counts_add() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO question_miss_counts AS m (student_id, question_id, wrong_count, last_wrong_at)
+        SELECT student_id, question_id, COUNT(*), MAX(answered_at)
+        FROM new_answers
+        WHERE is_correct = FALSE
+        GROUP BY student_id, question_id
+        ON CONFLICT (student_id, question_id) DO UPDATE SET
+            wrong_count = m.wrong_count + EXCLUDED.wrong_count,
+            last_wrong_at = GREATEST(m.last_wrong_at, EXCLUDED.last_wrong_at);
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql""",
+    """DO $$
+    BEGIN
+        IF NOT EXISTS (
+            SELECT 1 FROM pg_trigger
+            WHERE tgname = 'question_miss_counts_add' AND tgrelid = 'answers'::regclass
+        ) THEN
+            CREATE TRIGGER question_miss_counts_add AFTER INSERT ON answers
+                REFERENCING NEW TABLE AS new_answers
+                FOR EACH STATEMENT EXECUTE FUNCTION question_miss_counts_add();
+        END IF;
+    END $$""",
+    """INSERT INTO question_miss_counts (student_id, question_id, wrong_count, last_wrong_at)
+       SELECT student_id, question_id, COUNT(*), MAX(answered_at)
+       FROM answers
+       WHERE is_correct = FALSE
+         AND NOT EXISTS (SELECT 1 FROM question_miss_counts)
+       GROUP BY student_id, question_id""",
+    # Serves the NOT EXISTS anti-join in the unseen-question queries
+    "CREATE INDEX IF NOT EXISTS idx_answers_student_question ON answers (student_id, question_id)",
+    # Question pool lookups by type/level/difficulty
+    "CREATE INDEX IF NOT EXISTS idx_q_type_level_diff ON questions (question_type, level, difficulty)",
+    # Session review
+    "CREATE INDEX IF NOT EXISTS idx_answers_session ON answers (session_id)",
+    # Recent answers, daily activity and streaks
+    """CREATE INDEX IF NOT EXISTS idx_answers_student_answeredat
+       ON answers (student_id, answered_at DESC)
+       INCLUDE (is_correct, selected_answer, time_spent_seconds)""",
+    # Wrong-answer review
+    """CREATE INDEX IF NOT EXISTS idx_answers_student_wrong
+       ON answers (student_id, answered_at DESC) WHERE is_correct = FALSE""",
+    # Session history, with and without a mode filter
+    """CREATE INDEX IF NOT EXISTS idx_sessions_student_mode_started
+       ON test_sessions (student_id, mode, started_at DESC)""",
+    """CREATE INDEX IF NOT EXISTS idx_sessions_student_started
+       ON test_sessions (student_id, started_at DESC)""",
 ]
 
 
+def _json_dumps(obj) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+
+if orjson is not None:
+    # psycopg2 decodes every jsonb value (e.g. questions.choices) with this
+    psycopg2.extras.register_default_jsonb(globally=True, loads=orjson.loads)
+
+
+# Per-student tables cleared by reset_student_progress. test_sessions is the
+# final DELETE because answers and writing_samples reference it.
+PROGRESS_TABLES = (
+    "answers", "writing_samples", "topic_mastery", "badges", "vocabulary", "answers_daily",
+    "question_miss_counts",
+)
+
+
+def _reset_progress_sql(param: str) -> str:
+    """One statement deleting a student's progress; ``param`` is the placeholder."""
+    ctes = ",\n     ".join(
+        f"d_{table} AS (DELETE FROM {table} WHERE student_id = {param})"
+        for table in PROGRESS_TABLES
+    )
+    return f"WITH {ctes}\nDELETE FROM test_sessions WHERE student_id = {param}"
+
+
+# Fixed column orders for list reads that use plain tuple cursors
+STUDENT_COLUMNS = ("id", "name", "grade", "level", "created_at")
+ANSWER_COLUMNS = (
+    "id", "session_id", "question_id", "student_id", "selected_answer",
+    "is_correct", "time_spent_seconds", "answered_at",
+)
+QUESTION_COLUMNS = (
+    "id", "level", "question_type", "topic", "difficulty", "stem", "passage",
+    "choices", "correct_answer", "explanation", "generated_at", "batch_id",
+)
+SESSION_COLUMNS = (
+    "id", "student_id", "level", "grade", "mode", "started_at", "completed_at",
+    "verbal_raw", "verbal_scaled", "quantitative_raw", "quantitative_scaled",
+    "reading_raw", "reading_scaled", "total_scaled",
+    "verbal_percentile", "quantitative_percentile", "reading_percentile",
+)
+MASTERY_COLUMNS = (
+    "student_id", "topic_tag", "difficulty_level", "total_attempted",
+    "total_correct", "last_50_attempted", "last_50_correct", "last_50_bits",
+    "updated_at",
+)
+
+
+def _as_prepared(name: str, sql: str) -> str:
+    """``PREPARE name AS sql`` with psycopg2's %s placeholders numbered $1..$n."""
+    parts = sql.split("%s")
+    body = parts[0] + "".join(f"${i}{part}" for i, part in enumerate(parts[1:], 1))
+    return f"PREPARE {name} AS {body}"
+
+
+# SQL for queries LevelingEngine and QuestionCache run on every answer or
+# section, built once at import rather than per call
+_Q_COLUMNS = ", ".join(f"q.{c}" for c in QUESTION_COLUMNS)
+UNSEEN_SQL = """SELECT """ + _Q_COLUMNS + """ FROM questions q{sample}
+               WHERE {filters}
+                 AND NOT EXISTS (
+                     SELECT 1 FROM answers a
+                     WHERE a.question_id = q.id AND a.student_id = %s
+                 )
+               ORDER BY RANDOM()
+               LIMIT %s"""
+UNSEEN_BY_TYPES_SQL = f"""SELECT t.qtype, w.*
+                   FROM unnest(%s::text[], %s::int[], %s::int[]) AS t(qtype, diff, cnt)
+                   CROSS JOIN LATERAL (
+                       SELECT {_Q_COLUMNS} FROM questions q
+                       WHERE q.question_type = t.qtype AND q.level = %s
+                         AND NOT EXISTS (
+                             SELECT 1 FROM answers a
+                             WHERE a.question_id = q.id AND a.student_id = %s
+                         )
+                       ORDER BY (q.difficulty = t.diff) DESC, RANDOM()
+                       LIMIT t.cnt
+                   ) w"""
+COUNT_UNSEEN_BY_TYPE_SQL = """SELECT q.question_type, COUNT(*) FROM questions q
+                   WHERE q.level = %s
+                     AND NOT EXISTS (
+                         SELECT 1 FROM answers a
+                         WHERE a.question_id = q.id AND a.student_id = %s
+                     )
+                   GROUP BY q.question_type"""
+MASTERY_FOR_TAGS_SQL = f"""SELECT {', '.join(MASTERY_COLUMNS)} FROM topic_mastery
+                   WHERE student_id = %s AND topic_tag = ANY(%s::text[])"""
+RECENT_MIN_PERCENTILE_SQL = """SELECT COUNT(*),
+                          CASE WHEN BOOL_AND(verbal_percentile IS NOT NULL
+                                             AND quantitative_percentile IS NOT NULL
+                                             AND reading_percentile IS NOT NULL)
+                               THEN MIN(LEAST(verbal_percentile,
+                                              quantitative_percentile,
+                                              reading_percentile))
+                          END
+                   FROM (
+                       SELECT verbal_percentile, quantitative_percentile, reading_percentile
+                       FROM test_sessions
+                       WHERE student_id = %s AND mode = %s
+                       ORDER BY started_at DESC LIMIT %s
+                   ) recent"""
+HAS_WEAK_TOPIC_SQL = """SELECT EXISTS (
+                       SELECT 1 FROM topic_mastery
+                       WHERE student_id = %s
+                         AND total_attempted >= GREATEST(%s, 1)
+                         AND total_correct::real / total_attempted < %s
+                   )"""
+
+
+# Server-side prepared statements for per-student writes and the hot reads
+# above; created by initialize() when Database(prepare_statements=True)
+PREPARED_STATEMENTS = {
+    "get_student": "PREPARE get_student(int) AS SELECT * FROM students WHERE id = $1",
+    "get_question": "PREPARE get_question(int) AS SELECT * FROM questions WHERE id = $1",
+    "save_answer": (
+        "PREPARE save_answer(int, int, int, text, boolean, real, timestamp) AS "
+        "INSERT INTO answers (session_id, question_id, student_id, selected_answer, "
+        "is_correct, time_spent_seconds, answered_at) "
+        "VALUES ($1, $2, $3, $4, $5, $6, COALESCE($7, CURRENT_TIMESTAMP)) RETURNING id"
+    ),
+    "update_student": (
+        "PREPARE update_student(text, int, text, int) AS "
+        "UPDATE students SET name=$1, grade=$2, level=$3 WHERE id=$4"
+    ),
+    "reset_student_progress": (
+        "PREPARE reset_student_progress(int) AS " + _reset_progress_sql("$1")
+    ),
+    "unseen_questions_by_types": _as_prepared(
+        "unseen_questions_by_types", UNSEEN_BY_TYPES_SQL
+    ),
+    "count_unseen_by_type": _as_prepared("count_unseen_by_type", COUNT_UNSEEN_BY_TYPE_SQL),
+    "mastery_for_tags": _as_prepared("mastery_for_tags", MASTERY_FOR_TAGS_SQL),
+    "recent_min_percentile": _as_prepared("recent_min_percentile", RECENT_MIN_PERCENTILE_SQL),
+    "has_weak_topic": _as_prepared("has_weak_topic", HAS_WEAK_TOPIC_SQL),
+}
+
+
+# Upper bound on connections per Database: one writer plus autocommit readers.
+# The pool's getconn() raises PoolError rather than blocking when every
+# connection is out, so any fan-out of concurrent reads must stay below
+# POOL_MAX_CONNECTIONS - 1 (the writer always holds one).
+POOL_MAX_CONNECTIONS = 8
+
+# Questions are immutable once written, so rows fetched by id are kept in an
+# in-process LRU of this many entries
+QUESTION_CACHE_SIZE = 4096
+
+# save_questions switches to COPY at this many rows
+BULK_COPY_MIN_ROWS = 500
+
+# Unseen-question sampling: below this pool size ORDER BY RANDOM() over the
+# filtered rows is cheap; above it, sample ~SAMPLE_OVERSAMPLE x limit rows
+SAMPLE_MIN_POOL_SIZE = 2000
+SAMPLE_OVERSAMPLE = 5
+
+
+def _compile_row_builder(cls, columns: Tuple[str, ...], wrap: Dict[str, str]):
+    """Compile ``lambda r: cls(col=r[0], ...)`` for a fixed column order.
+
+    ``wrap`` maps a column to an expression template over ``{v}`` (the tuple
+    slot), so per-row conversion is straight-line code with no dict lookups.
+    """
+    args = ", ".join(
+        f"{col}=" + wrap.get(col, "{v}").format(v=f"r[{i}]")
+        for i, col in enumerate(columns)
+    )
+    return eval(f"lambda r: {cls.__name__}({args})", {cls.__name__: cls})
+
+
+_OPTIONAL_STR = "str({v}) if {v} else None"
+
+_tuple_to_student = _compile_row_builder(
+    Student, STUDENT_COLUMNS, {"created_at": _OPTIONAL_STR}
+)
+_tuple_to_answer = _compile_row_builder(
+    Answer, ANSWER_COLUMNS,
+    {
+        "time_spent_seconds": "{v} or 0.0",
+        "answered_at": _OPTIONAL_STR,
+    },
+)
+# choices is JSONB, which psycopg2 decodes to a dict
+_tuple_to_question = _compile_row_builder(
+    Question, QUESTION_COLUMNS, {"generated_at": _OPTIONAL_STR}
+)
+_tuple_to_session = _compile_row_builder(
+    TestSession, SESSION_COLUMNS,
+    {"started_at": _OPTIONAL_STR, "completed_at": _OPTIONAL_STR},
+)
+_tuple_to_mastery = _compile_row_builder(
+    TopicMastery, MASTERY_COLUMNS,
+    {"last_50_bits": "{v} or 0", "updated_at": _OPTIONAL_STR},
+)
+
+
+# Representative forms of the hot reads, checked by check_query_plans().
+# Each must reach answers/questions through an index.
+EXPLAIN_CHECKS = {
+    "unseen_questions": (
+        """SELECT q.id FROM questions q
+           WHERE q.question_type = %s AND q.level = %s AND q.difficulty = %s
+             AND NOT EXISTS (
+                 SELECT 1 FROM answers a
+                 WHERE a.question_id = q.id AND a.student_id = %s
+             )
+           ORDER BY RANDOM() LIMIT %s""",
+        ("synonym", "elementary", 3, 0, 10),
+    ),
+    "question_by_id": ("SELECT * FROM questions WHERE id = %s", (0,)),
+    "answers_for_session": ("SELECT * FROM answers WHERE session_id = %s", (0,)),
+    "wrong_answers": (
+        """SELECT a.id FROM answers a JOIN questions q ON a.question_id = q.id
+           WHERE a.student_id = %s AND a.is_correct = FALSE
+           ORDER BY a.answered_at DESC LIMIT %s""",
+        (0, 50),
+    ),
+    "answers_for_topic": (
+        """SELECT a.id FROM answers a JOIN questions q ON a.question_id = q.id
+           WHERE a.student_id = %s AND (q.question_type = %s OR q.topic = %s)
+           ORDER BY a.answered_at DESC LIMIT %s""",
+        (0, "synonym", "synonym", 50),
+    ),
+    "sessions_for_student": (
+        """SELECT * FROM test_sessions WHERE student_id = %s
+           ORDER BY started_at DESC LIMIT %s""",
+        (0, 20),
+    ),
+}
+
+
+def _copy_text(value) -> str:
+    """Format one value for COPY ... FROM STDIN (FORMAT text)."""
+    if value is None:
+        return "\\N"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
 class Database:
-    def __init__(self, db_url: str):
+    def __init__(
+        self, db_url: str, prepare_statements: bool = False, async_commit: bool = False
+    ):
         self.db_url = db_url
+        # PREPARE is per server session, so leave this off behind
+        # transaction-mode poolers (e.g. Supabase on port 6543)
+        self.prepare_statements = prepare_statements
+        self._prepared_conns: Set[int] = set()  # id() of connections with PREPAREs
+        self._pool_sizes: Dict[Tuple, int] = {}  # see _question_pool_size
+        self._question_cache: "OrderedDict[int, Question]" = OrderedDict()
+        self._student_cache: Dict[int, Student] = {}
+        self._tx_depth = 0  # nesting level of transaction() blocks
         # Append sslmode=require if not already present
         if "sslmode" not in db_url:
             separator = "&" if "?" in db_url else "?"
             db_url = f"{db_url}{separator}sslmode=require"
-        self.conn = psycopg2.connect(db_url)
+        self.pool = psycopg2.pool.ThreadedConnectionPool(1, POOL_MAX_CONNECTIONS, db_url)
+        # Writes go through one long-lived connection with explicit commits;
+        # reads borrow autocommit connections from the pool via _read()
+        self.conn = self.pool.getconn()
         self.conn.autocommit = False
+        if async_commit:
+            # Commits return before the WAL flush. A server crash can lose the
+            # last few answers but never corrupts data; like PREPARE, this is
+            # session state and needs a session-mode connection
+            cur = self.conn.cursor()
+            cur.execute("SET synchronous_commit TO off")
+            self.conn.commit()
+            cur.close()
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Run several write methods as one transaction with a single commit.
+
+        Writes inside the block skip their own commit; the outermost block
+        commits on exit or rolls back (and drops the in-process caches) if
+        it raises. Reads use pooled connections and don't see the block's
+        writes until it commits.
+        """
+        self._tx_depth += 1
+        try:
+            yield
+        except BaseException:
+            if self._tx_depth == 1:
+                self.conn.rollback()
+                self._question_cache.clear()
+                self._student_cache.clear()
+                self._pool_sizes.clear()
+            raise
+        else:
+            if self._tx_depth == 1:
+                self.conn.commit()
+        finally:
+            self._tx_depth -= 1
+
+    def _commit(self) -> None:
+        """Commit the write connection unless inside transaction()."""
+        if not self._tx_depth:
+            self.conn.commit()
 
     def initialize(self) -> None:
         cur = self.conn.cursor()
@@ -124,9 +572,72 @@ class Database:
             cur.execute(stmt)
         self.conn.commit()
         cur.close()
+        self._prepare(self.conn)
+
+    def check_query_plans(self) -> List[str]:
+        """EXPLAIN each EXPLAIN_CHECKS query and warn about sequential scans.
+
+        Sequential scans are disabled for the check, so one still showing up
+        means no usable index exists; small development tables don't cause
+        false alarms. Returns the names of the queries that failed.
+        """
+        failed = []
+        conn = self.pool.getconn()
+        conn.autocommit = False
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SET LOCAL enable_seqscan = off")
+                for name, (sql, params) in EXPLAIN_CHECKS.items():
+                    cur.execute("EXPLAIN " + sql, params)
+                    plan = "\n".join(r[0] for r in cur.fetchall())
+                    if "Seq Scan on answers" in plan or "Seq Scan on questions" in plan:
+                        logger.warning("Query %s scans a whole table:\n%s", name, plan)
+                        failed.append(name)
+        finally:
+            conn.rollback()
+            self.pool.putconn(conn)
+        return failed
 
     def close(self) -> None:
-        self.conn.close()
+        self.pool.closeall()
+
+    def _prepare(self, conn) -> None:
+        """Create PREPARED_STATEMENTS on ``conn`` once, if enabled."""
+        if not self.prepare_statements or id(conn) in self._prepared_conns:
+            return
+        cur = conn.cursor()
+        for stmt in PREPARED_STATEMENTS.values():
+            cur.execute(stmt)
+        if not conn.autocommit:
+            conn.commit()
+        cur.close()
+        self._prepared_conns.add(id(conn))
+
+    @contextmanager
+    def _read(self, dict_rows: bool = True):
+        """Borrow an autocommit connection from the pool for a read-only query.
+
+        Reads then neither hold a transaction open on the writer connection
+        nor queue behind it.
+        """
+        conn = self.pool.getconn()
+        conn.autocommit = True
+        self._prepare(conn)
+        factory = psycopg2.extras.RealDictCursor if dict_rows else None
+        cur = conn.cursor(cursor_factory=factory)
+        try:
+            yield cur
+        finally:
+            cur.close()
+            self.pool.putconn(conn)
+
+    def _execute(self, cur, name: str, sql: str, params: Tuple) -> None:
+        """Run ``sql``, or prepared statement ``name`` if statements were prepared."""
+        if id(cur.connection) in self._prepared_conns:
+            placeholders = ", ".join(["%s"] * len(params))
+            cur.execute(f"EXECUTE {name}({placeholders})", params)
+        else:
+            cur.execute(sql, params)
 
     def _cursor(self):
         """Return a RealDictCursor for dict-like row access."""
@@ -138,44 +649,46 @@ class Database:
     def create_student(self, name: str, grade: int, level: str) -> Student:
         cur = self._cursor()
         cur.execute(
-            "INSERT INTO students (name, grade, level) VALUES (%s, %s, %s) RETURNING id",
+            "INSERT INTO students (name, grade, level) VALUES (%s, %s, %s) RETURNING *",
             (name, grade, level),
         )
         row = cur.fetchone()
-        self.conn.commit()
+        self._commit()
         cur.close()
-        return Student(
-            id=row["id"],
-            name=name,
-            grade=grade,
-            level=level,
-            created_at=datetime.now().isoformat(),
-        )
+        return self._row_to_student(row)
 
     def get_student(self, student_id: int) -> Optional[Student]:
-        cur = self._cursor()
-        cur.execute("SELECT * FROM students WHERE id = %s", (student_id,))
-        row = cur.fetchone()
-        cur.close()
+        cached = self._student_cache.get(student_id)
+        if cached is not None:
+            return cached
+        with self._read() as cur:
+            self._execute(
+                cur, "get_student", "SELECT * FROM students WHERE id = %s", (student_id,)
+            )
+            row = cur.fetchone()
         if not row:
             return None
-        return self._row_to_student(row)
+        student = self._row_to_student(row)
+        self._student_cache[student_id] = student
+        return student
 
     def list_students(self) -> List[Student]:
-        cur = self._cursor()
-        cur.execute("SELECT * FROM students ORDER BY name")
-        rows = cur.fetchall()
-        cur.close()
-        return [self._row_to_student(r) for r in rows]
+        with self._read(dict_rows=False) as cur:
+            cur.execute(f"SELECT {', '.join(STUDENT_COLUMNS)} FROM students ORDER BY name")
+            rows = cur.fetchall()
+        return [_tuple_to_student(r) for r in rows]
 
     def update_student(self, student: Student) -> None:
         cur = self.conn.cursor()
-        cur.execute(
+        self._execute(
+            cur,
+            "update_student",
             "UPDATE students SET name=%s, grade=%s, level=%s WHERE id=%s",
             (student.name, student.grade, student.level, student.id),
         )
-        self.conn.commit()
+        self._commit()
         cur.close()
+        self._student_cache[student.id] = student
 
     def _row_to_student(self, row: dict) -> Student:
         return Student(
@@ -190,37 +703,99 @@ class Database:
     # Questions
     # ------------------------------------------------------------------
     def save_questions(self, questions: List[Question]) -> List[Question]:
-        saved = []
-        cur = self._cursor()
-        for q in questions:
-            choices_json = json.dumps(q.choices)
-            cur.execute(
-                """INSERT INTO questions
-                   (level, question_type, topic, difficulty, stem, passage,
-                    choices, correct_answer, explanation, batch_id)
-                   VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                   RETURNING id""",
-                (
-                    q.level, q.question_type, q.topic, q.difficulty,
-                    q.stem, q.passage, choices_json, q.correct_answer,
-                    q.explanation, q.batch_id,
-                ),
+        """Insert questions in one multi-row INSERT and assign their ids."""
+        if not questions:
+            return []
+        self._pool_sizes.clear()
+        if len(questions) >= BULK_COPY_MIN_ROWS:
+            return self.bulk_load_questions(questions)
+        rows = [
+            (
+                q.level, q.question_type, q.topic, q.difficulty,
+                q.stem, q.passage, psycopg2.extras.Json(q.choices, dumps=_json_dumps),
+                q.correct_answer, q.explanation, q.batch_id,
             )
-            row = cur.fetchone()
-            q.id = row["id"]
-            saved.append(q)
-        self.conn.commit()
+            for q in questions
+        ]
+        cur = self.conn.cursor()
+        ids = psycopg2.extras.execute_values(
+            cur,
+            """INSERT INTO questions
+               (level, question_type, topic, difficulty, stem, passage,
+                choices, correct_answer, explanation, batch_id)
+               VALUES %s
+               RETURNING id""",
+            rows,
+            page_size=200,
+            fetch=True,
+        )
+        self._commit()
         cur.close()
-        return saved
+        for q, (question_id,) in zip(questions, ids):
+            q.id = question_id
+        return list(questions)
 
-    def get_question(self, question_id: int) -> Optional[Question]:
-        cur = self._cursor()
-        cur.execute("SELECT * FROM questions WHERE id = %s", (question_id,))
-        row = cur.fetchone()
+    def bulk_load_questions(self, questions: List[Question]) -> List[Question]:
+        """Insert many questions with COPY, for large imports.
+
+        Ids are reserved from the serial sequence up front and included in
+        the COPY stream, since COPY cannot return generated ids.
+        """
+        if not questions:
+            return []
+        self._pool_sizes.clear()
+        cur = self.conn.cursor()
+        cur.execute(
+            "SELECT nextval(pg_get_serial_sequence('questions', 'id')) "
+            "FROM generate_series(1, %s)",
+            (len(questions),),
+        )
+        ids = [row[0] for row in cur.fetchall()]
+
+        buf = io.StringIO()
+        for question_id, q in zip(ids, questions):
+            fields = (
+                question_id, q.level, q.question_type, q.topic, q.difficulty,
+                q.stem, q.passage, _json_dumps(q.choices), q.correct_answer,
+                q.explanation, q.batch_id,
+            )
+            buf.write("\t".join(_copy_text(f) for f in fields))
+            buf.write("\n")
+        buf.seek(0)
+        cur.copy_expert(
+            """COPY questions
+               (id, level, question_type, topic, difficulty, stem, passage,
+                choices, correct_answer, explanation, batch_id)
+               FROM STDIN WITH (FORMAT text)""",
+            buf,
+        )
+        self._commit()
         cur.close()
+        for q, question_id in zip(questions, ids):
+            q.id = question_id
+        return list(questions)
+
+    def _cache_question(self, q: Question) -> None:
+        self._question_cache[q.id] = q
+        self._question_cache.move_to_end(q.id)
+        if len(self._question_cache) > QUESTION_CACHE_SIZE:
+            self._question_cache.popitem(last=False)
+
+    def get_question(self, question_id: int) -> Optional[Question]:
+        cached = self._question_cache.get(question_id)
+        if cached is not None:
+            self._question_cache.move_to_end(question_id)
+            return cached
+        with self._read() as cur:
+            self._execute(
+                cur, "get_question", "SELECT * FROM questions WHERE id = %s", (question_id,)
+            )
+            row = cur.fetchone()
         if not row:
             return None
-        return self._row_to_question(row)
+        q = self._row_to_question(row)
+        self._cache_question(q)
+        return q
 
     def get_unseen_questions(
         self,
@@ -230,22 +805,13 @@ class Database:
         difficulty: int,
         limit: int = 25,
     ) -> List[Question]:
-        cur = self._cursor()
-        cur.execute(
-            """SELECT q.* FROM questions q
-               WHERE q.question_type = %s
-                 AND q.level = %s
-                 AND q.difficulty = %s
-                 AND q.id NOT IN (
-                     SELECT question_id FROM answers WHERE student_id = %s
-                 )
-               ORDER BY RANDOM()
-               LIMIT %s""",
-            (question_type, level, difficulty, student_id, limit),
+        return self._select_unseen(
+            "q.question_type = %s AND q.level = %s AND q.difficulty = %s",
+            (question_type, level, difficulty),
+            student_id,
+            limit,
+            self._question_pool_size(question_type, level, difficulty),
         )
-        rows = cur.fetchall()
-        cur.close()
-        return [self._row_to_question(r) for r in rows]
 
     def get_unseen_questions_any_difficulty(
         self,
@@ -254,62 +820,143 @@ class Database:
         level: str,
         limit: int = 25,
     ) -> List[Question]:
-        cur = self._cursor()
-        cur.execute(
-            """SELECT q.* FROM questions q
-               WHERE q.question_type = %s
-                 AND q.level = %s
-                 AND q.id NOT IN (
-                     SELECT question_id FROM answers WHERE student_id = %s
-                 )
-               ORDER BY RANDOM()
-               LIMIT %s""",
-            (question_type, level, student_id, limit),
+        return self._select_unseen(
+            "q.question_type = %s AND q.level = %s",
+            (question_type, level),
+            student_id,
+            limit,
+            self._question_pool_size(question_type, level),
         )
-        rows = cur.fetchall()
-        cur.close()
-        return [self._row_to_question(r) for r in rows]
 
-    def count_unseen_questions(
-        self, student_id: int, question_type: str, level: str
+    def get_unseen_questions_by_types(
+        self,
+        student_id: int,
+        level: str,
+        wanted: Dict[str, Tuple[int, int]],
+    ) -> Dict[str, List[Question]]:
+        """Unseen questions for several types in one query.
+
+        ``wanted`` maps question type to (target difficulty, count). Each type
+        gets up to ``count`` random unseen questions, preferring the target
+        difficulty and filling the rest from any difficulty.
+        """
+        result: Dict[str, List[Question]] = {qtype: [] for qtype in wanted}
+        if not wanted:
+            return result
+        types = list(wanted)
+        with self._read(dict_rows=False) as cur:
+            self._execute(
+                cur, "unseen_questions_by_types", UNSEEN_BY_TYPES_SQL,
+                (
+                    types,
+                    [wanted[t][0] for t in types],
+                    [wanted[t][1] for t in types],
+                    level,
+                    student_id,
+                ),
+            )
+            rows = cur.fetchall()
+        for r in rows:
+            result[r[0]].append(_tuple_to_question(r[1:]))
+        return result
+
+    def _question_pool_size(
+        self, question_type: str, level: str, difficulty: Optional[int] = None
     ) -> int:
-        cur = self._cursor()
-        cur.execute(
-            """SELECT COUNT(*) as cnt FROM questions q
-               WHERE q.question_type = %s
-                 AND q.level = %s
-                 AND q.id NOT IN (
-                     SELECT question_id FROM answers WHERE student_id = %s
-                 )""",
-            (question_type, level, student_id),
-        )
-        row = cur.fetchone()
-        cur.close()
-        return row["cnt"] if row else 0
+        """Number of questions of a type/level (and difficulty), cached until
+        the next save."""
+        key = (question_type, level, difficulty)
+        if key not in self._pool_sizes:
+            sql = "SELECT COUNT(*) FROM questions WHERE question_type = %s AND level = %s"
+            params = [question_type, level]
+            if difficulty is not None:
+                sql += " AND difficulty = %s"
+                params.append(difficulty)
+            with self._read(dict_rows=False) as cur:
+                cur.execute(sql, params)
+                self._pool_sizes[key] = cur.fetchone()[0]
+        return self._pool_sizes[key]
+
+    def _select_unseen(
+        self,
+        filters: str,
+        params: Tuple,
+        student_id: int,
+        limit: int,
+        pool_size: int,
+    ) -> List[Question]:
+        """Random unseen questions matching ``filters``.
+
+        Large pools are sampled with TABLESAMPLE BERNOULLI so only a few times
+        ``limit`` rows get sorted by RANDOM(); if the sample comes up short
+        (e.g. most sampled rows were already answered) the full query runs.
+        """
+        with self._read(dict_rows=False) as cur:
+            rows = []
+            if pool_size >= SAMPLE_MIN_POOL_SIZE:
+                pct = min(100.0, 100.0 * limit * SAMPLE_OVERSAMPLE / pool_size)
+                cur.execute(
+                    UNSEEN_SQL.format(
+                        sample=" TABLESAMPLE BERNOULLI (%s)", filters=filters
+                    ),
+                    (pct, *params, student_id, limit),
+                )
+                rows = cur.fetchall()
+            if len(rows) < limit:
+                cur.execute(
+                    UNSEEN_SQL.format(sample="", filters=filters),
+                    (*params, student_id, limit),
+                )
+                rows = cur.fetchall()
+        return [_tuple_to_question(r) for r in rows]
+
+    def count_unseen_questions_by_type(self, student_id: int, level: str) -> Dict[str, int]:
+        """Unseen question counts for every type at ``level`` in one query.
+        Types with no unseen questions are absent from the result."""
+        with self._read(dict_rows=False) as cur:
+            self._execute(
+                cur, "count_unseen_by_type", COUNT_UNSEEN_BY_TYPE_SQL, (level, student_id)
+            )
+            return dict(cur.fetchall())
 
     def get_questions_by_ids(self, ids: List[int]) -> List[Question]:
         if not ids:
             return []
-        cur = self._cursor()
-        cur.execute(
-            "SELECT * FROM questions WHERE id = ANY(%s)", (ids,)
-        )
-        rows = cur.fetchall()
-        cur.close()
-        return [self._row_to_question(r) for r in rows]
+        found = {i: self._question_cache[i] for i in ids if i in self._question_cache}
+        missing = [i for i in ids if i not in found]
+        if missing:
+            with self._read(dict_rows=False) as cur:
+                cur.execute(
+                    f"SELECT {', '.join(QUESTION_COLUMNS)} FROM questions WHERE id = ANY(%s)",
+                    (missing,),
+                )
+                rows = cur.fetchall()
+            for r in rows:
+                q = _tuple_to_question(r)
+                self._cache_question(q)
+                found[q.id] = q
+        return [found[i] for i in ids if i in found]
 
-    def get_all_stems(self) -> List[str]:
-        """Return all question stems for deduplication."""
-        cur = self._cursor()
-        cur.execute("SELECT stem FROM questions")
-        rows = cur.fetchall()
-        cur.close()
-        return [r["stem"] for r in rows]
+    def find_existing_stems(self, stems: List[str]) -> Set[str]:
+        """Return the subset of ``stems`` already stored (case/whitespace-
+        insensitive), checked via the stem_hash index in one query."""
+        if not stems:
+            return set()
+        with self._read(dict_rows=False) as cur:
+            cur.execute(
+                """SELECT s.stem FROM unnest(%s::text[]) AS s(stem)
+                   WHERE EXISTS (
+                       SELECT 1 FROM questions q
+                       WHERE q.stem_hash = hashtextextended(lower(btrim(s.stem)), 0)
+                         AND lower(btrim(q.stem)) = lower(btrim(s.stem))
+                   )""",
+                (list(stems),),
+            )
+            rows = cur.fetchall()
+        return {r[0] for r in rows}
 
     def _row_to_question(self, row: dict) -> Question:
-        choices = row["choices"]
-        if isinstance(choices, str):
-            choices = json.loads(choices)
+        # choices is JSONB, which psycopg2 decodes to a dict
         return Question(
             id=row["id"],
             level=row["level"],
@@ -318,7 +965,7 @@ class Database:
             difficulty=row["difficulty"],
             stem=row["stem"],
             passage=row["passage"],
-            choices=choices,
+            choices=row["choices"],
             correct_answer=row["correct_answer"],
             explanation=row["explanation"],
             generated_at=str(row["generated_at"]) if row["generated_at"] else None,
@@ -333,19 +980,20 @@ class Database:
         cur.execute(
             """INSERT INTO test_sessions
                (student_id, level, grade, mode, started_at)
-               VALUES (%s, %s, %s, %s, %s)
-               RETURNING id""",
+               VALUES (%s, %s, %s, %s, COALESCE(%s::timestamp, CURRENT_TIMESTAMP))
+               RETURNING id, started_at""",
             (
                 session.student_id,
                 session.level,
                 session.grade,
                 session.mode,
-                session.started_at or datetime.now().isoformat(),
+                session.started_at,
             ),
         )
         row = cur.fetchone()
-        self.conn.commit()
+        self._commit()
         session.id = row["id"]
+        session.started_at = str(row["started_at"])
         cur.close()
         return session
 
@@ -371,244 +1019,241 @@ class Database:
                 session.id,
             ),
         )
-        self.conn.commit()
+        self._commit()
         cur.close()
 
     def get_sessions_for_student(
-        self, student_id: int, mode: Optional[str] = None, limit: int = 20
+        self,
+        student_id: int,
+        mode: Optional[str] = None,
+        limit: int = 20,
+        before: Optional[str] = None,
     ) -> List[TestSession]:
-        cur = self._cursor()
+        """Most recent sessions first. Pass the last returned session's
+        ``started_at`` as ``before`` to fetch the next page (keyset
+        pagination on idx_sessions_student_*)."""
+        filters = "student_id = %s"
+        params: list = [student_id]
         if mode:
+            filters += " AND mode = %s"
+            params.append(mode)
+        if before:
+            filters += " AND started_at < %s::timestamp"
+            params.append(before)
+        with self._read(dict_rows=False) as cur:
             cur.execute(
-                """SELECT * FROM test_sessions
-                   WHERE student_id = %s AND mode = %s
+                f"""SELECT {', '.join(SESSION_COLUMNS)} FROM test_sessions
+                   WHERE {filters}
                    ORDER BY started_at DESC LIMIT %s""",
-                (student_id, mode, limit),
+                (*params, limit),
             )
-        else:
-            cur.execute(
-                """SELECT * FROM test_sessions
-                   WHERE student_id = %s
-                   ORDER BY started_at DESC LIMIT %s""",
-                (student_id, limit),
-            )
-        rows = cur.fetchall()
-        cur.close()
-        return [self._row_to_session(r) for r in rows]
-
-    def _row_to_session(self, row: dict) -> TestSession:
-        return TestSession(
-            id=row["id"],
-            student_id=row["student_id"],
-            level=row["level"],
-            grade=row["grade"],
-            mode=row["mode"],
-            started_at=str(row["started_at"]) if row["started_at"] else None,
-            completed_at=str(row["completed_at"]) if row["completed_at"] else None,
-            verbal_raw=row["verbal_raw"],
-            verbal_scaled=row["verbal_scaled"],
-            quantitative_raw=row["quantitative_raw"],
-            quantitative_scaled=row["quantitative_scaled"],
-            reading_raw=row["reading_raw"],
-            reading_scaled=row["reading_scaled"],
-            total_scaled=row["total_scaled"],
-            verbal_percentile=row["verbal_percentile"],
-            quantitative_percentile=row["quantitative_percentile"],
-            reading_percentile=row["reading_percentile"],
-        )
+            rows = cur.fetchall()
+        return [_tuple_to_session(r) for r in rows]
 
     # ------------------------------------------------------------------
     # Answers
     # ------------------------------------------------------------------
     def save_answer(self, answer: Answer) -> Answer:
         cur = self._cursor()
-        cur.execute(
+        self._execute(
+            cur,
+            "save_answer",
             """INSERT INTO answers
                (session_id, question_id, student_id, selected_answer,
                 is_correct, time_spent_seconds, answered_at)
-               VALUES (%s, %s, %s, %s, %s, %s, %s)
+               VALUES (%s, %s, %s, %s, %s, %s, COALESCE(%s::timestamp, CURRENT_TIMESTAMP))
                RETURNING id""",
             (
                 answer.session_id, answer.question_id, answer.student_id,
-                answer.selected_answer,
-                bool(answer.is_correct) if answer.is_correct is not None else None,
-                answer.time_spent_seconds,
-                answer.answered_at or datetime.now().isoformat(),
+                answer.selected_answer, answer.is_correct,
+                answer.time_spent_seconds, answer.answered_at,
             ),
         )
         row = cur.fetchone()
-        self.conn.commit()
+        self._commit()
         answer.id = row["id"]
         cur.close()
         return answer
 
     def save_answers(self, answers: List[Answer]) -> List[Answer]:
-        for a in answers:
-            self.save_answer(a)
+        """Insert a batch of answers in one multi-row INSERT and one commit."""
+        if not answers:
+            return answers
+        rows = [
+            (
+                a.session_id, a.question_id, a.student_id, a.selected_answer,
+                a.is_correct, a.time_spent_seconds, a.answered_at,
+            )
+            for a in answers
+        ]
+        cur = self.conn.cursor()
+        ids = psycopg2.extras.execute_values(
+            cur,
+            """INSERT INTO answers
+               (session_id, question_id, student_id, selected_answer,
+                is_correct, time_spent_seconds, answered_at)
+               VALUES %s
+               RETURNING id""",
+            rows,
+            template="(%s, %s, %s, %s, %s, %s, COALESCE(%s::timestamp, CURRENT_TIMESTAMP))",
+            page_size=500,
+            fetch=True,
+        )
+        self._commit()
+        cur.close()
+        for a, (answer_id,) in zip(answers, ids):
+            a.id = answer_id
         return answers
 
     def get_answers_for_session(self, session_id: int) -> List[Answer]:
-        cur = self._cursor()
-        cur.execute(
-            "SELECT * FROM answers WHERE session_id = %s ORDER BY id",
-            (session_id,),
-        )
-        rows = cur.fetchall()
-        cur.close()
-        return [self._row_to_answer(r) for r in rows]
+        with self._read(dict_rows=False) as cur:
+            cur.execute(
+                f"SELECT {', '.join(ANSWER_COLUMNS)} FROM answers WHERE session_id = %s ORDER BY id",
+                (session_id,),
+            )
+            rows = cur.fetchall()
+        return [_tuple_to_answer(r) for r in rows]
 
     def get_wrong_answers_for_student(
-        self, student_id: int, limit: int = 50
+        self, student_id: int, limit: int = 50, before: Optional[str] = None
     ) -> List[Tuple[Answer, Question]]:
-        cur = self._cursor()
-        cur.execute(
-            """SELECT a.id, a.session_id, a.question_id, a.student_id,
-                      a.selected_answer, a.is_correct, a.time_spent_seconds,
-                      a.answered_at,
-                      q.level as q_level, q.question_type as q_type,
-                      q.topic as q_topic, q.difficulty as q_difficulty,
-                      q.stem as q_stem, q.passage as q_passage,
-                      q.choices as q_choices, q.correct_answer as q_correct,
-                      q.explanation as q_explanation,
-                      q.generated_at as q_generated_at, q.batch_id as q_batch_id
-               FROM answers a
-               JOIN questions q ON a.question_id = q.id
-               WHERE a.student_id = %s AND a.is_correct = FALSE
-               ORDER BY a.answered_at DESC
-               LIMIT %s""",
-            (student_id, limit),
+        """Most recent wrong answers first. Pass the last returned answer's
+        ``answered_at`` as ``before`` to fetch the next page (keyset
+        pagination on idx_answers_student_wrong)."""
+        keyset = " AND a.answered_at < %s::timestamp" if before else ""
+        params = (student_id, before) if before else (student_id,)
+        # One tuple per row: the answer columns, then the question columns
+        columns = ", ".join(
+            [f"a.{c}" for c in ANSWER_COLUMNS] + [f"q.{c}" for c in QUESTION_COLUMNS]
         )
-        rows = cur.fetchall()
-        cur.close()
-        results = []
-        for r in rows:
-            answer = self._row_to_answer(r)
-            choices = r["q_choices"]
-            if isinstance(choices, str):
-                choices = json.loads(choices)
-            question = Question(
-                id=r["question_id"],
-                level=r["q_level"],
-                question_type=r["q_type"],
-                topic=r["q_topic"],
-                difficulty=r["q_difficulty"],
-                stem=r["q_stem"],
-                passage=r["q_passage"],
-                choices=choices,
-                correct_answer=r["q_correct"],
-                explanation=r["q_explanation"],
-                generated_at=str(r["q_generated_at"]) if r["q_generated_at"] else None,
-                batch_id=r["q_batch_id"],
+        split = len(ANSWER_COLUMNS)
+        with self._read(dict_rows=False) as cur:
+            cur.execute(
+                f"""SELECT {columns}
+                   FROM answers a
+                   JOIN questions q ON a.question_id = q.id
+                   WHERE a.student_id = %s AND a.is_correct = FALSE{keyset}
+                   ORDER BY a.answered_at DESC
+                   LIMIT %s""",
+                (*params, limit),
             )
-            results.append((answer, question))
-        return results
+            rows = cur.fetchall()
+        return [(_tuple_to_answer(r[:split]), _tuple_to_question(r[split:])) for r in rows]
+
+    def count_wrong_answers_by_type(
+        self, student_id: int, limit: int = 200
+    ) -> Dict[str, int]:
+        """Wrong-answer counts per question type over the student's ``limit``
+        most recent mistakes, aggregated in SQL without building models."""
+        with self._read(dict_rows=False) as cur:
+            cur.execute(
+                """SELECT q.question_type, COUNT(*)
+                   FROM (
+                       SELECT question_id FROM answers
+                       WHERE student_id = %s AND is_correct = FALSE
+                       ORDER BY answered_at DESC
+                       LIMIT %s
+                   ) a
+                   JOIN questions q ON q.id = a.question_id
+                   GROUP BY q.question_type""",
+                (student_id, limit),
+            )
+            rows = cur.fetchall()
+        return dict(rows)
 
     def get_frequently_missed_questions(
         self, student_id: int, min_wrong_count: int = 2
     ) -> List[Tuple[Question, int]]:
-        cur = self._cursor()
-        cur.execute(
-            """SELECT q.*, COUNT(*) as wrong_count
-               FROM answers a
-               JOIN questions q ON a.question_id = q.id
-               WHERE a.student_id = %s AND a.is_correct = FALSE
-               GROUP BY q.id, q.level, q.question_type, q.topic, q.difficulty,
-                        q.stem, q.passage, q.choices, q.correct_answer,
-                        q.explanation, q.generated_at, q.batch_id
-               HAVING COUNT(*) >= %s
-               ORDER BY COUNT(*) DESC""",
-            (student_id, min_wrong_count),
-        )
-        rows = cur.fetchall()
-        cur.close()
-        results = []
-        for r in rows:
-            q = self._row_to_question(r)
-            results.append((q, r["wrong_count"]))
-        return results
-
-    def get_answers_for_student_topic(
-        self, student_id: int, topic_tag: str, limit: int = 50
-    ) -> List[Answer]:
-        cur = self._cursor()
-        cur.execute(
-            """SELECT a.* FROM answers a
-               JOIN questions q ON a.question_id = q.id
-               WHERE a.student_id = %s
-                 AND (q.question_type = %s OR q.topic = %s)
-               ORDER BY a.answered_at DESC
-               LIMIT %s""",
-            (student_id, topic_tag, topic_tag, limit),
-        )
-        rows = cur.fetchall()
-        cur.close()
-        return [self._row_to_answer(r) for r in rows]
-
-    def _row_to_answer(self, row: dict) -> Answer:
-        return Answer(
-            id=row["id"],
-            session_id=row["session_id"],
-            question_id=row["question_id"],
-            student_id=row["student_id"],
-            selected_answer=row["selected_answer"],
-            is_correct=bool(row["is_correct"]) if row["is_correct"] is not None else None,
-            time_spent_seconds=row["time_spent_seconds"] or 0.0,
-            answered_at=str(row["answered_at"]) if row["answered_at"] else None,
-        )
+        columns = ", ".join(f"q.{c}" for c in QUESTION_COLUMNS)
+        with self._read(dict_rows=False) as cur:
+            cur.execute(
+                f"""SELECT {columns}, m.wrong_count
+                   FROM question_miss_counts m
+                   JOIN questions q ON q.id = m.question_id
+                   WHERE m.student_id = %s AND m.wrong_count >= %s
+                   ORDER BY m.wrong_count DESC""",
+                (student_id, min_wrong_count),
+            )
+            rows = cur.fetchall()
+        return [(_tuple_to_question(r), r[-1]) for r in rows]
 
     # ------------------------------------------------------------------
     # Topic Mastery
     # ------------------------------------------------------------------
     def upsert_topic_mastery(self, mastery: TopicMastery) -> None:
+        self.upsert_topic_mastery_bulk([mastery])
+
+    def upsert_topic_mastery_bulk(self, records: List[TopicMastery]) -> None:
+        """Upsert several mastery records in one statement and one commit."""
+        if not records:
+            return
         cur = self.conn.cursor()
-        cur.execute(
+        psycopg2.extras.execute_values(
+            cur,
             """INSERT INTO topic_mastery
                (student_id, topic_tag, difficulty_level,
                 total_attempted, total_correct,
-                last_50_attempted, last_50_correct, updated_at)
-               VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                last_50_attempted, last_50_correct, last_50_bits, updated_at)
+               VALUES %s
                ON CONFLICT(student_id, topic_tag) DO UPDATE SET
                  difficulty_level = EXCLUDED.difficulty_level,
                  total_attempted = EXCLUDED.total_attempted,
                  total_correct = EXCLUDED.total_correct,
                  last_50_attempted = EXCLUDED.last_50_attempted,
                  last_50_correct = EXCLUDED.last_50_correct,
+                 last_50_bits = EXCLUDED.last_50_bits,
                  updated_at = EXCLUDED.updated_at""",
-            (
-                mastery.student_id, mastery.topic_tag,
-                mastery.difficulty_level,
-                mastery.total_attempted, mastery.total_correct,
-                mastery.last_50_attempted, mastery.last_50_correct,
-                mastery.updated_at or datetime.now().isoformat(),
-            ),
+            [
+                (
+                    m.student_id, m.topic_tag, m.difficulty_level,
+                    m.total_attempted, m.total_correct,
+                    m.last_50_attempted, m.last_50_correct, m.last_50_bits,
+                    m.updated_at,
+                )
+                for m in records
+            ],
+            template="(%s, %s, %s, %s, %s, %s, %s, %s, COALESCE(%s::timestamp, CURRENT_TIMESTAMP))",
         )
-        self.conn.commit()
+        self._commit()
         cur.close()
 
     def get_topic_mastery(self, student_id: int) -> List[TopicMastery]:
-        cur = self._cursor()
-        cur.execute(
-            "SELECT * FROM topic_mastery WHERE student_id = %s ORDER BY topic_tag",
-            (student_id,),
-        )
-        rows = cur.fetchall()
-        cur.close()
-        return [self._row_to_mastery(r) for r in rows]
+        with self._read(dict_rows=False) as cur:
+            cur.execute(
+                f"""SELECT {', '.join(MASTERY_COLUMNS)} FROM topic_mastery
+                   WHERE student_id = %s ORDER BY topic_tag""",
+                (student_id,),
+            )
+            rows = cur.fetchall()
+        return [_tuple_to_mastery(r) for r in rows]
 
     def get_topic_mastery_for_tag(
         self, student_id: int, topic_tag: str
     ) -> Optional[TopicMastery]:
-        cur = self._cursor()
-        cur.execute(
-            "SELECT * FROM topic_mastery WHERE student_id = %s AND topic_tag = %s",
-            (student_id, topic_tag),
-        )
-        row = cur.fetchone()
-        cur.close()
+        with self._read() as cur:
+            cur.execute(
+                "SELECT * FROM topic_mastery WHERE student_id = %s AND topic_tag = %s",
+                (student_id, topic_tag),
+            )
+            row = cur.fetchone()
         if not row:
             return None
         return self._row_to_mastery(row)
 
+    def get_topic_mastery_for_tags(
+        self, student_id: int, topic_tags: List[str]
+    ) -> Dict[str, TopicMastery]:
+        """Mastery records for several topics in one query, keyed by tag."""
+        if not topic_tags:
+            return {}
+        with self._read(dict_rows=False) as cur:
+            self._execute(
+                cur, "mastery_for_tags", MASTERY_FOR_TAGS_SQL,
+                (student_id, list(topic_tags)),
+            )
+            rows = cur.fetchall()
+        return {m.topic_tag: m for m in map(_tuple_to_mastery, rows)}
+
     def _row_to_mastery(self, row: dict) -> TopicMastery:
         return TopicMastery(
             student_id=row["student_id"],
@@ -618,6 +1263,7 @@ class Database:
             total_correct=row["total_correct"],
             last_50_attempted=row["last_50_attempted"],
             last_50_correct=row["last_50_correct"],
+            last_50_bits=row["last_50_bits"] or 0,
             updated_at=str(row["updated_at"]) if row["updated_at"] else None,
         )
 
@@ -637,7 +1283,7 @@ class Database:
             ),
         )
         row = cur.fetchone()
-        self.conn.commit()
+        self._commit()
         sample.id = row["id"]
         cur.close()
         return sample
@@ -645,15 +1291,14 @@ class Database:
     def get_writing_samples(
         self, student_id: int, limit: int = 10
     ) -> List[WritingSample]:
-        cur = self._cursor()
-        cur.execute(
-            """SELECT * FROM writing_samples
-               WHERE student_id = %s
-               ORDER BY created_at DESC LIMIT %s""",
-            (student_id, limit),
-        )
-        rows = cur.fetchall()
-        cur.close()
+        with self._read() as cur:
+            cur.execute(
+                """SELECT * FROM writing_samples
+                   WHERE student_id = %s
+                   ORDER BY created_at DESC LIMIT %s""",
+                (student_id, limit),
+            )
+            rows = cur.fetchall()
         return [self._row_to_writing(r) for r in rows]
 
     def _row_to_writing(self, row: dict) -> WritingSample:
@@ -671,150 +1316,158 @@ class Database:
     # Statistics helpers
     # ------------------------------------------------------------------
     def get_student_stats(self, student_id: int) -> Dict:
-        cur = self._cursor()
-
-        cur.execute(
-            "SELECT COUNT(*) as cnt FROM test_sessions WHERE student_id = %s AND mode = 'full_test'",
-            (student_id,),
-        )
-        full_tests = cur.fetchone()["cnt"]
+        # The answer total sums the per-day rollup (one row per active day)
+        # instead of counting the student's whole answer history
+        with self._read() as cur:
+            cur.execute(
+                """SELECT COUNT(*) FILTER (WHERE mode = 'full_test') AS full_tests,
+                          COUNT(*) FILTER (WHERE mode = 'section_practice') AS section_practices,
+                          COUNT(*) FILTER (WHERE mode = 'quick_drill') AS drills,
+                          (SELECT COALESCE(SUM(total), 0) FROM answers_daily
+                           WHERE student_id = %s) AS total_answers
+                   FROM test_sessions
+                   WHERE student_id = %s""",
+                (student_id, student_id),
+            )
+            row = cur.fetchone()
+        return {
+            "full_tests": row["full_tests"],
+            "section_practices": row["section_practices"],
+            "drills": row["drills"],
+            "total_answers": row["total_answers"],
+        }
 
-        cur.execute(
-            "SELECT COUNT(*) as cnt FROM test_sessions WHERE student_id = %s AND mode = 'section_practice'",
-            (student_id,),
-        )
-        section_practices = cur.fetchone()["cnt"]
+    def recent_min_percentile(
+        self, student_id: int, mode: str, n: int
+    ) -> Tuple[int, Optional[int]]:
+        """(session count, lowest section percentile) over the ``n`` most recent
+        sessions of ``mode``. The percentile is None if any of those sessions
+        is missing a section percentile."""
+        with self._read(dict_rows=False) as cur:
+            self._execute(
+                cur, "recent_min_percentile", RECENT_MIN_PERCENTILE_SQL,
+                (student_id, mode, n),
+            )
+            count, min_pct = cur.fetchone()
+        return count, min_pct
 
-        cur.execute(
-            "SELECT COUNT(*) as cnt FROM test_sessions WHERE student_id = %s AND mode = 'quick_drill'",
-            (student_id,),
-        )
-        drills = cur.fetchone()["cnt"]
+    def has_weak_topic(
+        self, student_id: int, min_attempted: int, min_accuracy: float
+    ) -> bool:
+        """Whether any topic with at least ``min_attempted`` answers is below
+        ``min_accuracy``."""
+        with self._read(dict_rows=False) as cur:
+            self._execute(
+                cur, "has_weak_topic", HAS_WEAK_TOPIC_SQL,
+                (student_id, min_attempted, min_accuracy),
+            )
+            return cur.fetchone()[0]
 
-        cur.execute(
-            "SELECT COUNT(*) as cnt FROM answers WHERE student_id = %s",
-            (student_id,),
-        )
-        total_answers = cur.fetchone()["cnt"]
+    def get_dashboard_bundle(self, student_id: int, session_limit: int = 50) -> Dict:
+        """Fetch stats, recent sessions, topic mastery and streak concurrently.
 
-        cur.close()
-        return {
-            "full_tests": full_tests,
-            "section_practices": section_practices,
-            "drills": drills,
-            "total_answers": total_answers,
+        Each query borrows its own pooled connection, so the dashboard waits
+        roughly one round-trip instead of four.
+        """
+        calls = {
+            "stats": (self.get_student_stats, (student_id,)),
+            "sessions": (self.get_sessions_for_student, (student_id, None, session_limit)),
+            "mastery": (self.get_topic_mastery, (student_id,)),
+            "streak": (self.get_streak_data, (student_id,)),
         }
+        # One pooled reader per call; see POOL_MAX_CONNECTIONS
+        assert len(calls) < POOL_MAX_CONNECTIONS - 1
+        with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+            futures = {key: executor.submit(fn, *args) for key, (fn, args) in calls.items()}
+            return {key: future.result() for key, future in futures.items()}
 
     def get_daily_activity(self, student_id: int, days: int = 30) -> List[Dict]:
         """Get per-day activity: questions answered, correct, accuracy, time spent."""
-        cur = self._cursor()
-        cur.execute(
-            """SELECT DATE(a.answered_at) as day,
-                      COUNT(*) as total,
-                      SUM(CASE WHEN a.is_correct = TRUE THEN 1 ELSE 0 END) as correct,
-                      SUM(CASE WHEN a.selected_answer IS NULL THEN 1 ELSE 0 END) as skipped,
-                      SUM(a.time_spent_seconds) as total_time
-               FROM answers a
-               WHERE a.student_id = %s
-                 AND a.answered_at >= CURRENT_DATE - make_interval(days => %s)
-               GROUP BY DATE(a.answered_at)
-               ORDER BY day""",
-            (student_id, days),
-        )
-        rows = cur.fetchall()
-        cur.close()
+        with self._read(dict_rows=False) as cur:
+            cur.execute(
+                """SELECT day, total, correct, skipped, total_time
+                   FROM answers_daily
+                   WHERE student_id = %s
+                     AND day >= CURRENT_DATE - %s
+                   ORDER BY day""",
+                (student_id, days),
+            )
+            rows = cur.fetchall()
         return [
             {
-                "day": str(r["day"]),
-                "total": r["total"],
-                "correct": r["correct"],
-                "skipped": r["skipped"],
-                "wrong": r["total"] - r["correct"] - r["skipped"],
-                "total_time": r["total_time"] or 0,
+                "day": str(day),
+                "total": total,
+                "correct": correct,
+                "skipped": skipped,
+                "wrong": total - correct - skipped,
+                "total_time": total_time or 0,
             }
-            for r in rows
+            for day, total, correct, skipped, total_time in rows
         ]
 
     def get_daily_activity_by_topic(self, student_id: int, days: int = 30) -> List[Dict]:
         """Get per-day, per-topic breakdown."""
-        cur = self._cursor()
-        cur.execute(
-            """SELECT DATE(a.answered_at) as day,
-                      q.question_type as topic,
-                      COUNT(*) as total,
-                      SUM(CASE WHEN a.is_correct = TRUE THEN 1 ELSE 0 END) as correct
-               FROM answers a
-               JOIN questions q ON a.question_id = q.id
-               WHERE a.student_id = %s
-                 AND a.answered_at >= CURRENT_DATE - make_interval(days => %s)
-               GROUP BY DATE(a.answered_at), q.question_type
-               ORDER BY day, topic""",
-            (student_id, days),
-        )
-        rows = cur.fetchall()
-        cur.close()
+        with self._read() as cur:
+            cur.execute(
+                """SELECT DATE(a.answered_at) as day,
+                          q.question_type as topic,
+                          COUNT(*) as total,
+                          SUM(CASE WHEN a.is_correct = TRUE THEN 1 ELSE 0 END) as correct
+                   FROM answers a
+                   JOIN questions q ON a.question_id = q.id
+                   WHERE a.student_id = %s
+                     AND a.answered_at >= CURRENT_DATE - make_interval(days => %s)
+                   GROUP BY DATE(a.answered_at), q.question_type
+                   ORDER BY day, topic""",
+                (student_id, days),
+            )
+            rows = cur.fetchall()
         return [
             {"day": str(r["day"]), "topic": r["topic"], "total": r["total"], "correct": r["correct"]}
             for r in rows
         ]
 
     def get_streak_data(self, student_id: int) -> Dict:
-        """Calculate current streak (consecutive days with activity) and longest streak."""
-        cur = self._cursor()
-        cur.execute(
-            """SELECT DISTINCT DATE(answered_at) as day
-               FROM answers
-               WHERE student_id = %s
-               ORDER BY day DESC""",
-            (student_id,),
-        )
-        rows = cur.fetchall()
-        cur.close()
-        if not rows:
-            return {"current_streak": 0, "longest_streak": 0, "total_days": 0}
-
-        from datetime import date, timedelta
-        days_active = [r["day"] if isinstance(r["day"], date) else date.fromisoformat(str(r["day"])) for r in rows]
-        total_days = len(days_active)
-
-        # Current streak (from today backwards)
-        today = date.today()
-        current_streak = 0
-        check = today
-        for d in days_active:
-            if d == check or d == check - timedelta(days=1):
-                current_streak += 1
-                check = d - timedelta(days=1)
-            else:
-                break
-
-        # Longest streak
-        longest = 1
-        current = 1
-        for i in range(1, len(days_active)):
-            if days_active[i - 1] - days_active[i] == timedelta(days=1):
-                current += 1
-                longest = max(longest, current)
-            else:
-                current = 1
+        """Calculate current streak (consecutive days with activity) and longest streak.
 
+        Consecutive days form islands sharing the same ``day - row_number``;
+        the current streak is the island ending today or yesterday.
+        """
+        with self._read() as cur:
+            cur.execute(
+                """WITH g AS (
+                       SELECT day, day - (ROW_NUMBER() OVER (ORDER BY day))::int AS grp
+                       FROM answers_daily
+                       WHERE student_id = %s
+                   ),
+                   islands AS (
+                       SELECT MAX(day) AS last_day, COUNT(*) AS len
+                       FROM g GROUP BY grp
+                   )
+                   SELECT COALESCE(MAX(len) FILTER (WHERE last_day >= CURRENT_DATE - 1), 0)::int
+                              AS current_streak,
+                          COALESCE(MAX(len), 0)::int AS longest_streak,
+                          COALESCE(SUM(len), 0)::int AS total_days
+                   FROM islands""",
+                (student_id,),
+            )
+            row = cur.fetchone()
         return {
-            "current_streak": current_streak,
-            "longest_streak": max(longest, current_streak),
-            "total_days": total_days,
+            "current_streak": row["current_streak"],
+            "longest_streak": row["longest_streak"],
+            "total_days": row["total_days"],
         }
 
     # ------------------------------------------------------------------
     # Badges
     # ------------------------------------------------------------------
     def get_badges(self, student_id: int) -> List[Dict]:
-        cur = self._cursor()
-        cur.execute(
-            "SELECT badge_name, badge_description, badge_icon, earned_at FROM badges WHERE student_id = %s ORDER BY earned_at",
-            (student_id,),
-        )
-        rows = cur.fetchall()
-        cur.close()
+        with self._read() as cur:
+            cur.execute(
+                "SELECT badge_name, badge_description, badge_icon, earned_at FROM badges WHERE student_id = %s ORDER BY earned_at",
+                (student_id,),
+            )
+            rows = cur.fetchall()
         return [dict(r) for r in rows]
 
     def save_badge(self, student_id: int, name: str, description: str, icon: str) -> None:
@@ -823,20 +1476,19 @@ class Database:
             "INSERT INTO badges (student_id, badge_name, badge_description, badge_icon) VALUES (%s, %s, %s, %s)",
             (student_id, name, description, icon),
         )
-        self.conn.commit()
+        self._commit()
         cur.close()
 
     # ------------------------------------------------------------------
     # Vocabulary
     # ------------------------------------------------------------------
     def get_vocabulary(self, student_id: int) -> List[Dict]:
-        cur = self._cursor()
-        cur.execute(
-            "SELECT * FROM vocabulary WHERE student_id = %s ORDER BY created_at DESC",
-            (student_id,),
-        )
-        rows = cur.fetchall()
-        cur.close()
+        with self._read() as cur:
+            cur.execute(
+                "SELECT * FROM vocabulary WHERE student_id = %s ORDER BY created_at DESC",
+                (student_id,),
+            )
+            rows = cur.fetchall()
         return [dict(r) for r in rows]
 
     def save_vocabulary_word(self, student_id: int, word: str, definition: str,
@@ -855,7 +1507,7 @@ class Database:
             "VALUES (%s, %s, %s, %s, %s)",
             (student_id, word, definition, example, tip),
         )
-        self.conn.commit()
+        self._commit()
         cur.close()
 
     def update_vocabulary_review(self, vocab_id: int, correct: bool) -> None:
@@ -872,20 +1524,22 @@ class Database:
                 "last_reviewed = CURRENT_TIMESTAMP WHERE id = %s",
                 (vocab_id,),
             )
-        self.conn.commit()
+        self._commit()
         cur.close()
 
     # ------------------------------------------------------------------
     # Reset helper (used by settings page)
     # ------------------------------------------------------------------
     def reset_student_progress(self, student_id: int) -> None:
-        """Delete all progress data for a student."""
+        """Delete all progress data for a student in a single round-trip.
+
+        Data-modifying CTEs run as one statement, so foreign-key checks
+        between answers, writing_samples and test_sessions see all deletes.
+        """
         cur = self.conn.cursor()
-        cur.execute("DELETE FROM answers WHERE student_id = %s", (student_id,))
-        cur.execute("DELETE FROM test_sessions WHERE student_id = %s", (student_id,))
-        cur.execute("DELETE FROM topic_mastery WHERE student_id = %s", (student_id,))
-        cur.execute("DELETE FROM writing_samples WHERE student_id = %s", (student_id,))
-        cur.execute("DELETE FROM badges WHERE student_id = %s", (student_id,))
-        cur.execute("DELETE FROM vocabulary WHERE student_id = %s", (student_id,))
-        self.conn.commit()
+        if id(self.conn) in self._prepared_conns:
+            cur.execute("EXECUTE reset_student_progress(%s)", (student_id,))
+        else:
+            cur.execute(_reset_progress_sql("%(sid)s"), {"sid": student_id})
+        self._commit()
         cur.close()
@@ -1,9 +1,10 @@
 import os
-from typing import Dict, List, Optional
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
 
 from rich.align import Align
 from rich.columns import Columns
-from rich.console import Console
+from rich.console import Console, Group, RenderableType
 from rich.panel import Panel
 from rich.rule import Rule
 from rich.table import Table
@@ -28,6 +29,21 @@ custom_theme = Theme({
 
 console = Console(theme=custom_theme)
 
+# Static renderables, built once instead of on every call
+_BANNER = Align.center(Text("  SSAT Practice Test  ", style="bold white on blue"))
+_TAGLINE = Align.center(Text("Personalized SSAT Prep for Success", style="dim"))
+_WRITING_HINT = Text(
+    "  Type your response below. Press Enter twice on a blank line when done.",
+    style="dim",
+)
+_TIMER_FORMATS = (  # (upper bound in seconds, markup format)
+    (60, "[timer_critical]{:02d}:{:02d}[/timer_critical]"),
+    (300, "[timer_warn]{:02d}:{:02d}[/timer_warn]"),
+)
+_TIMER_OK_FORMAT = "[timer_ok]{:02d}:{:02d}[/timer_ok]"
+_BAR_WIDTH = 40
+_FULL_BAR = "█" * _BAR_WIDTH
+
 
 # ---------------------------------------------------------------------------
 # General UI
@@ -38,15 +54,13 @@ def clear_screen() -> None:
 
 
 def show_banner() -> None:
-    banner = Text()
-    banner.append("  SSAT Practice Test  ", style="bold white on blue")
     console.print()
-    console.print(Align.center(banner))
-    console.print(Align.center(Text("Personalized SSAT Prep for Success", style="dim")))
+    console.print(_BANNER)
+    console.print(_TAGLINE)
     console.print()
 
 
-def show_menu(title: str, options: List[str]) -> int:
+def show_menu(title: str, options: Sequence[str]) -> int:
     """Show a numbered menu and return 1-indexed selection."""
     console.print(Rule(title, style="header"))
     console.print()
@@ -224,29 +238,30 @@ def show_section_result(result: SectionResult, level: str) -> None:
         secs = int(result.time_used_seconds) % 60
         table.add_row("Time Used", f"{mins}m {secs}s")
 
-    console.print(table)
-    console.print()
+    console.print(Group(table, ""))
 
 
-def show_full_score_report(
+def full_score_report(
     student: Student,
     session: TestSession,
     section_results: List[SectionResult],
     topic_breakdown: Dict[str, Dict],
-) -> None:
-    """Display the comprehensive end-of-test score report."""
+) -> Group:
+    """Build the comprehensive end-of-test score report."""
     from config import LEVEL_CONFIGS
     level_config = LEVEL_CONFIGS.get(session.level)
 
-    console.print()
-    console.print(Rule("[bold]SSAT PRACTICE TEST - SCORE REPORT[/bold]", style="header"))
-    console.print(Align.center(Text(
-        f"{student.name} - Grade {student.grade} - {level_config.display_name if level_config else session.level}",
-        style="bold",
-    )))
+    items: List[RenderableType] = [
+        "",
+        Rule("[bold]SSAT PRACTICE TEST - SCORE REPORT[/bold]", style="header"),
+        Align.center(Text(
+            f"{student.name} - Grade {student.grade} - {level_config.display_name if level_config else session.level}",
+            style="bold",
+        )),
+    ]
     if session.started_at:
-        console.print(Align.center(Text(f"Date: {session.started_at[:10]}", style="dim")))
-    console.print()
+        items.append(Align.center(Text(f"Date: {session.started_at[:10]}", style="dim")))
+    items.append("")
 
     # Section scores table
     scores_table = Table(border_style="blue", padding=(0, 1))
@@ -283,21 +298,20 @@ def show_full_score_report(
         total_row.append(f"{score_range_min}-{score_range_max}")
     scores_table.add_row(*total_row, style="bold")
 
-    console.print(scores_table)
-    console.print()
+    items += [scores_table, ""]
 
     # Summary
-    console.print(f"  Questions Answered: {total_correct + total_wrong}/{total_questions}")
-    console.print(
+    items += [
+        f"  Questions Answered: {total_correct + total_wrong}/{total_questions}",
         f"  Correct: [correct]{total_correct}[/correct]  |  "
         f"Incorrect: [wrong]{total_wrong}[/wrong]  |  "
-        f"Skipped: [skip]{total_skipped}[/skip]"
-    )
-    console.print()
+        f"Skipped: [skip]{total_skipped}[/skip]",
+        "",
+    ]
 
     # Topic breakdown
     if topic_breakdown:
-        console.print(Rule("Topic Breakdown", style="dim"))
+        items.append(Rule("Topic Breakdown", style="dim"))
         strong = []
         needs_work = []
         weak = []
@@ -313,14 +327,25 @@ def show_full_score_report(
                 weak.append(entry)
 
         if strong:
-            console.print(f"  [strong]Strong:[/strong] {', '.join(strong)}")
+            items.append(f"  [strong]Strong:[/strong] {', '.join(strong)}")
         if needs_work:
-            console.print(f"  [needs_work]Needs Work:[/needs_work] {', '.join(needs_work)}")
+            items.append(f"  [needs_work]Needs Work:[/needs_work] {', '.join(needs_work)}")
         if weak:
-            console.print(f"  [weak]Weak:[/weak] {', '.join(weak)}")
-        console.print()
+            items.append(f"  [weak]Weak:[/weak] {', '.join(weak)}")
+        items.append("")
+
+    items.append(Rule(style="dim"))
+    return Group(*items)
 
-    console.print(Rule(style="dim"))
+
+def show_full_score_report(
+    student: Student,
+    session: TestSession,
+    section_results: List[SectionResult],
+    topic_breakdown: Dict[str, Dict],
+) -> None:
+    """Display the comprehensive end-of-test score report."""
+    console.print(full_score_report(student, session, section_results, topic_breakdown))
 
 
 def show_drill_summary(
@@ -357,60 +382,65 @@ def show_drill_summary(
 # Progress display
 # ---------------------------------------------------------------------------
 
-def show_progress_dashboard(
+def progress_dashboard(
     student: Student,
     stats: Dict,
     sessions: List[TestSession],
     mastery: List[TopicMastery],
-) -> None:
-    """Render the full progress dashboard."""
-    console.print()
-    console.print(Rule(
-        f"Progress Report - {student.name} (Grade {student.grade}, "
-        f"{student.level.title()} Level)",
-        style="header",
-    ))
-    console.print()
-
-    # Overall stats
-    console.print(
+) -> Group:
+    """Build the full progress dashboard."""
+    items: List[RenderableType] = [
+        "",
+        Rule(
+            f"Progress Report - {student.name} (Grade {student.grade}, "
+            f"{student.level.title()} Level)",
+            style="header",
+        ),
+        "",
+        # Overall stats
         f"  Tests Taken: {stats['full_tests']} full tests, "
         f"{stats['section_practices']} section practices, "
-        f"{stats['drills']} drills"
-    )
-    console.print(f"  Total Questions Answered: {stats['total_answers']:,}")
-    console.print()
+        f"{stats['drills']} drills",
+        f"  Total Questions Answered: {stats['total_answers']:,}",
+        "",
+    ]
 
     # Score trend for full tests
     full_tests = [s for s in sessions if s.mode == "full_test" and s.total_scaled]
     if full_tests:
-        console.print(Rule("Score Trend (Full Tests)", style="dim"))
-        show_score_trend(full_tests[:10])
-        console.print()
+        items += [Rule("Score Trend (Full Tests)", style="dim"), score_trend(full_tests[:10]), ""]
 
     # Topic mastery
     if mastery:
-        console.print(Rule("Topic Mastery", style="dim"))
-        show_topic_breakdown(mastery)
-        console.print()
+        items += [Rule("Topic Mastery", style="dim"), topic_breakdown(mastery), ""]
 
-    console.print(Rule(style="dim"))
+    items.append(Rule(style="dim"))
+    return Group(*items)
 
 
-def show_score_trend(sessions: List[TestSession]) -> None:
+def show_progress_dashboard(
+    student: Student,
+    stats: Dict,
+    sessions: List[TestSession],
+    mastery: List[TopicMastery],
+) -> None:
+    """Render the full progress dashboard."""
+    console.print(progress_dashboard(student, stats, sessions, mastery))
+
+
+def score_trend(sessions: List[TestSession]) -> RenderableType:
     """ASCII bar chart of recent test scores."""
     if not sessions:
-        console.print("  No test data yet.")
-        return
+        return "  No test data yet."
 
     # Determine scale
     scores = [s.total_scaled for s in sessions if s.total_scaled]
     if not scores:
-        console.print("  No scored tests yet.")
-        return
+        return "  No scored tests yet."
 
     max_score = max(scores)
-    bar_width = 40
+    bar_width = _BAR_WIDTH
+    from config import LEVEL_CONFIGS
 
     table = Table(show_header=True, border_style="dim", padding=(0, 1))
     table.add_column("Date", style="dim", width=12)
@@ -425,7 +455,6 @@ def show_score_trend(sessions: List[TestSession]) -> None:
         bar_len = int((score / max_score) * bar_width) if max_score > 0 else 0
 
         # Color based on relative performance
-        from config import LEVEL_CONFIGS
         lc = LEVEL_CONFIGS.get(s.level)
         if lc:
             total_max = lc.score_max * len(lc.sections)
@@ -441,15 +470,19 @@ def show_score_trend(sessions: List[TestSession]) -> None:
         else:
             color = "red"
 
-        bar = Text("█" * bar_len, style=color)
+        bar = Text(_FULL_BAR[:bar_len], style=color)
         table.add_row(date_str, str(score), bar)
 
-    console.print(table)
+    return table
 
 
-def show_topic_breakdown(mastery: List[TopicMastery]) -> None:
+def show_score_trend(sessions: List[TestSession]) -> None:
+    console.print(score_trend(sessions))
+
+
+def topic_breakdown(mastery: List[TopicMastery]) -> Table:
     """Table of topic mastery with color-coded accuracy."""
-    from config import QUESTION_TYPE_DISPLAY
+    import config
 
     table = Table(show_header=True, border_style="dim", padding=(0, 1))
     table.add_column("Topic", style="bold")
@@ -462,7 +495,7 @@ def show_topic_breakdown(mastery: List[TopicMastery]) -> None:
         if m.total_attempted == 0:
             continue
         accuracy = m.total_correct / m.total_attempted
-        display_name = QUESTION_TYPE_DISPLAY.get(m.topic_tag, m.topic_tag.title())
+        display_name = config.display_name(m.topic_tag)
 
         if accuracy >= 0.85:
             style = "strong"
@@ -482,7 +515,11 @@ def show_topic_breakdown(mastery: List[TopicMastery]) -> None:
             f"[{style}]{status}[/{style}]",
         )
 
-    console.print(table)
+    return table
+
+
+def show_topic_breakdown(mastery: List[TopicMastery]) -> None:
+    console.print(topic_breakdown(mastery))
 
 
 # ---------------------------------------------------------------------------
@@ -491,16 +528,11 @@ def show_topic_breakdown(mastery: List[TopicMastery]) -> None:
 
 def format_time_remaining(seconds: int) -> str:
     """Return formatted time string with color based on remaining time."""
-    mins = seconds // 60
-    secs = seconds % 60
-    time_str = f"{mins:02d}:{secs:02d}"
-
-    if seconds <= 60:
-        return f"[timer_critical]{time_str}[/timer_critical]"
-    elif seconds <= 300:
-        return f"[timer_warn]{time_str}[/timer_warn]"
-    else:
-        return f"[timer_ok]{time_str}[/timer_ok]"
+    mins, secs = divmod(seconds, 60)
+    for limit, fmt in _TIMER_FORMATS:
+        if seconds <= limit:
+            return fmt.format(mins, secs)
+    return _TIMER_OK_FORMAT.format(mins, secs)
 
 
 # ---------------------------------------------------------------------------
@@ -517,7 +549,7 @@ def show_writing_prompt(prompt_text: str, time_minutes: int) -> None:
         padding=(1, 2),
     ))
     console.print()
-    console.print("  [dim]Type your response below. Press Enter twice on a blank line when done.[/dim]")
+    console.print(_WRITING_HINT)
     console.print()
 
 
@@ -598,16 +630,21 @@ def show_level_down_offer(student_name: str, current_level: str, previous_level:
 # Misc
 # ---------------------------------------------------------------------------
 
-def show_section_intro(section_name: str, question_count: int, time_minutes: int) -> None:
-    console.print()
-    console.print(Panel(
+@lru_cache(maxsize=64)
+def _section_intro_panel(section_name: str, question_count: int, time_minutes: int) -> Panel:
+    return Panel(
         f"[bold]{section_name}[/bold]\n\n"
         f"Questions: {question_count}\n"
         f"Time: {time_minutes} minutes\n\n"
         f"[dim]Answer A-E for each question, or S to skip.[/dim]",
         border_style="blue",
         padding=(1, 2),
-    ))
+    )
+
+
+def show_section_intro(section_name: str, question_count: int, time_minutes: int) -> None:
+    console.print()
+    console.print(_section_intro_panel(section_name, question_count, time_minutes))
     console.print()
 
 
@@ -625,8 +662,8 @@ def show_pool_stats(stats: Dict[str, int]) -> None:
     table.add_column("Available", justify="right")
 
     for qtype, count in sorted(stats.items()):
-        from config import QUESTION_TYPE_DISPLAY
-        display_name = QUESTION_TYPE_DISPLAY.get(qtype, qtype.title())
+        import config
+        display_name = config.display_name(qtype)
         style = "correct" if count >= 10 else ("needs_work" if count >= 5 else "wrong")
         table.add_row(display_name, f"[{style}]{count}[/{style}]")
 
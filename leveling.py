@@ -9,11 +9,16 @@ from database import Database
 from models import Answer, Question, Student, TopicMastery
 from question_cache import LEVEL_TYPES
 
+_LAST_50_MASK = (1 << 50) - 1
+
 
 class LevelingEngine:
     def __init__(self, db: Database, student: Student):
         self.db = db
         self.student = student
+        # (level, {type: difficulty}) from the last get_difficulty_map call;
+        # cleared whenever mastery is updated
+        self._difficulty_cache: Optional[Tuple[str, Dict[str, int]]] = None
 
     # ------------------------------------------------------------------
     # Difficulty
@@ -22,17 +27,28 @@ class LevelingEngine:
     def get_difficulty_for_topic(self, topic_tag: str) -> int:
         """Get current difficulty (1-5) for a given topic."""
         mastery = self.db.get_topic_mastery_for_tag(self.student.id, topic_tag)
+        return self._difficulty_from(mastery)
+
+    @staticmethod
+    def _difficulty_from(mastery: Optional[TopicMastery]) -> int:
         if mastery:
             return max(1, min(5, round(mastery.difficulty_level)))
         return round(config.DIFFICULTY_DEFAULT)
 
     def get_difficulty_map(self) -> Dict[str, int]:
-        """Get difficulty for all topic/type combinations."""
-        types = LEVEL_TYPES.get(self.student.level, [])
-        result = {}
-        for qtype in types:
-            result[qtype] = self.get_difficulty_for_topic(qtype)
-        return result
+        """Get difficulty for all topic/type combinations.
+
+        Loaded in one query and cached until the next mastery update.
+        """
+        level = self.student.level
+        if self._difficulty_cache is None or self._difficulty_cache[0] != level:
+            types = LEVEL_TYPES.get(level, [])
+            masteries = self.db.get_topic_mastery_for_tags(self.student.id, types)
+            self._difficulty_cache = (
+                level,
+                {qtype: self._difficulty_from(masteries.get(qtype)) for qtype in types},
+            )
+        return dict(self._difficulty_cache[1])
 
     # ------------------------------------------------------------------
     # Update after answering questions
@@ -57,11 +73,20 @@ class LevelingEngine:
                 by_type[topic] = []
             by_type[topic].append((a, q))
 
+        # Load every affected topic's mastery and last-50 window up front
+        topics = list(by_type)
+        masteries = self.db.get_topic_mastery_for_tags(self.student.id, topics)
+
         events = []
+        updated = []
+        now = datetime.now().isoformat()
         for topic, pairs in by_type.items():
-            event = self._update_topic(topic, pairs)
+            mastery, event = self._update_topic(topic, pairs, masteries.get(topic), now)
+            updated.append(mastery)
             if event:
                 events.append(event)
+        self.db.upsert_topic_mastery_bulk(updated)
+        self._difficulty_cache = None
 
         # Check for level mastery
         mastery_event = self._check_level_mastery()
@@ -74,13 +99,17 @@ class LevelingEngine:
         self,
         topic_tag: str,
         pairs: List[Tuple[Answer, Question]],
-    ) -> Optional[str]:
-        """Update mastery record for a single topic."""
-        if not pairs:
-            return None
+        mastery: Optional[TopicMastery],
+        updated_at: str,
+    ) -> Tuple[TopicMastery, Optional[str]]:
+        """Update mastery record for a single topic.
+
+        ``mastery`` is the stored record (None if the topic is new) and
+        ``updated_at`` the timestamp shared by the whole session. Returns
+        the updated record, for the caller to save, and an event message if
+        the difficulty changed.
+        """
 
-        # Get or create mastery record
-        mastery = self.db.get_topic_mastery_for_tag(self.student.id, topic_tag)
         if not mastery:
             mastery = TopicMastery(
                 student_id=self.student.id,
@@ -97,14 +126,13 @@ class LevelingEngine:
         mastery.total_attempted += session_total
         mastery.total_correct += session_correct
 
-        # Update last-50 window
-        recent_answers = self.db.get_answers_for_student_topic(
-            self.student.id, topic_tag, limit=50
-        )
-        mastery.last_50_attempted = min(len(recent_answers), 50)
-        mastery.last_50_correct = sum(
-            1 for a in recent_answers[:50] if a.is_correct
-        )
+        # Slide the last-50 window over this session's answers, oldest first
+        bits = mastery.last_50_bits
+        for a, _ in pairs:
+            bits = ((bits << 1) | bool(a.is_correct)) & _LAST_50_MASK
+        mastery.last_50_bits = bits
+        mastery.last_50_attempted = min(mastery.last_50_attempted + session_total, 50)
+        mastery.last_50_correct = bits.bit_count()
 
         overall_accuracy = (
             mastery.total_correct / mastery.total_attempted
@@ -114,6 +142,7 @@ class LevelingEngine:
         # Difficulty adjustment
         event = None
         old_difficulty = mastery.difficulty_level
+        display_name = config.display_name(topic_tag)
 
         if mastery.total_attempted >= config.MIN_QUESTIONS_FOR_ADJUST:
             if (
@@ -126,9 +155,6 @@ class LevelingEngine:
                 )
                 if new_diff != mastery.difficulty_level:
                     mastery.difficulty_level = new_diff
-                    display_name = config.QUESTION_TYPE_DISPLAY.get(
-                        topic_tag, topic_tag.title()
-                    )
                     event = (
                         f"Difficulty up! {display_name}: "
                         f"{old_difficulty:.1f} -> {new_diff:.1f}"
@@ -144,18 +170,14 @@ class LevelingEngine:
                 )
                 if new_diff != mastery.difficulty_level:
                     mastery.difficulty_level = new_diff
-                    display_name = config.QUESTION_TYPE_DISPLAY.get(
-                        topic_tag, topic_tag.title()
-                    )
                     event = (
                         f"Difficulty adjusted: {display_name}: "
                         f"{old_difficulty:.1f} -> {new_diff:.1f}"
                     )
 
-        mastery.updated_at = datetime.now().isoformat()
-        self.db.upsert_topic_mastery(mastery)
+        mastery.updated_at = updated_at
 
-        return event
+        return mastery, event
 
     # ------------------------------------------------------------------
     # Level mastery check
@@ -163,38 +185,21 @@ class LevelingEngine:
 
     def _check_level_mastery(self) -> Optional[str]:
         """Check if the student has mastered their current level."""
-        # Need at least MASTERY_TEST_COUNT full tests
-        sessions = self.db.get_sessions_for_student(
-            self.student.id, mode="full_test", limit=config.MASTERY_TEST_COUNT
+        # Need MASTERY_TEST_COUNT recent full tests, every section at or
+        # above MASTERY_PERCENTILE
+        count, min_pct = self.db.recent_min_percentile(
+            self.student.id, "full_test", config.MASTERY_TEST_COUNT
         )
-
-        if len(sessions) < config.MASTERY_TEST_COUNT:
+        if count < config.MASTERY_TEST_COUNT:
             return None
-
-        recent_sessions = sessions[:config.MASTERY_TEST_COUNT]
-
-        # Check percentiles on all sections
-        all_high = True
-        for s in recent_sessions:
-            for field in ("verbal_percentile", "quantitative_percentile", "reading_percentile"):
-                pct = getattr(s, field, None)
-                if pct is None or pct < config.MASTERY_PERCENTILE:
-                    all_high = False
-                    break
-            if not all_high:
-                break
-
-        if not all_high:
+        if min_pct is None or min_pct < config.MASTERY_PERCENTILE:
             return None
 
         # Check topic accuracy
-        mastery_records = self.db.get_topic_mastery(self.student.id)
-        for m in mastery_records:
-            if m.total_attempted < config.MASTERY_MIN_QUESTIONS:
-                continue
-            accuracy = m.total_correct / m.total_attempted
-            if accuracy < config.MASTERY_ACCURACY:
-                return None
+        if self.db.has_weak_topic(
+            self.student.id, config.MASTERY_MIN_QUESTIONS, config.MASTERY_ACCURACY
+        ):
+            return None
 
         # Mastery achieved! Determine next level
         return self._level_up()
@@ -26,7 +26,7 @@ class SessionMode(str, Enum):
     REVIEW = "review"
 
 
-@dataclass
+@dataclass(slots=True)
 class Student:
     id: Optional[int] = None
     name: str = ""
@@ -35,7 +35,7 @@ class Student:
     created_at: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Question:
     id: Optional[int] = None
     level: str = "elementary"
@@ -51,7 +51,7 @@ class Question:
     batch_id: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Answer:
     id: Optional[int] = None
     session_id: Optional[int] = None
@@ -78,7 +78,7 @@ class SectionResult:
     answers: List[Answer] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class TestSession:
     id: Optional[int] = None
     student_id: Optional[int] = None
@@ -100,7 +100,7 @@ class TestSession:
     reading_percentile: Optional[int] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class TopicMastery:
     student_id: Optional[int] = None
     topic_tag: str = ""
@@ -109,10 +109,11 @@ class TopicMastery:
     total_correct: int = 0
     last_50_attempted: int = 0
     last_50_correct: int = 0
+    last_50_bits: int = 0  # correctness of the last 50 answers, newest in bit 0
     updated_at: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class WritingSample:
     id: Optional[int] = None
     student_id: Optional[int] = None
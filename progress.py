@@ -46,18 +46,21 @@ class ProgressTracker:
         if stats["full_tests"] == 0:
             recs.append("Try a full practice test to get a complete score report.")
 
-        # Find weak topics
+        # Classify topics in one pass
         weak_topics = []
         needs_work_topics = []
+        strong_topics = []
         for m in mastery:
             if m.total_attempted < 5:
                 continue
-            accuracy = m.total_correct / m.total_attempted if m.total_attempted > 0 else 0
-            display_name = config.QUESTION_TYPE_DISPLAY.get(m.topic_tag, m.topic_tag.title())
+            accuracy = m.total_correct / m.total_attempted
+            display_name = config.display_name(m.topic_tag)
             if accuracy < 0.60:
                 weak_topics.append(display_name)
             elif accuracy < 0.85:
                 needs_work_topics.append(display_name)
+            elif m.total_attempted >= 10:
+                strong_topics.append(display_name)
 
         if weak_topics:
             recs.append(f"Focus on: {', '.join(weak_topics)} - try quick drills to build skills.")
@@ -74,16 +77,6 @@ class ProgressTracker:
             elif recent < previous:
                 recs.append("Scores dipped slightly. Focus on weak areas with targeted drills.")
 
-        # Strong topics
-        strong_topics = []
-        for m in mastery:
-            if m.total_attempted < 10:
-                continue
-            accuracy = m.total_correct / m.total_attempted
-            if accuracy >= 0.85:
-                display_name = config.QUESTION_TYPE_DISPLAY.get(m.topic_tag, m.topic_tag.title())
-                strong_topics.append(display_name)
-
         if strong_topics:
             recs.append(f"Great mastery in: {', '.join(strong_topics)}!")
 
@@ -1,6 +1,8 @@
 """Question pool management, caching, and batch generation."""
 
-from typing import Callable, Dict, List, Optional
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Set
 
 import config
 from config import LEVEL_CONFIGS, SectionConfig
@@ -21,6 +23,12 @@ LEVEL_TYPES = {
     "middle": ["synonym", "analogy", "arithmetic", "algebra", "geometry", "word_problem", "reading_comprehension"],
 }
 
+def _stem_key(stem: str) -> int:
+    """64-bit key of a stem's normalized (trimmed, lowercased) text."""
+    digest = hashlib.blake2b(stem.strip().lower().encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
 # Default no-op status callback
 def _noop_status(msg: str, level: str = "info") -> None:
     pass
@@ -36,6 +44,9 @@ class QuestionCache:
         self.db = db
         self.generator = generator
         self._on_status = on_status or _noop_status
+        # Keys of stems this process has saved, so repeats from the generator
+        # are dropped without asking the database
+        self._saved_stem_keys: Set[int] = set()
 
     def get_questions(
         self,
@@ -95,7 +106,7 @@ class QuestionCache:
             # Deduplicate and save
             new_questions = self._deduplicate(new_questions)
             if new_questions:
-                self.db.save_questions(new_questions)
+                self._save(new_questions)
                 questions.extend(new_questions)
 
         except QuestionGenerationError as e:
@@ -137,41 +148,72 @@ class QuestionCache:
             type_counts = {t: per_type for t in types}
             type_counts[types[0]] += remainder
 
-        for qtype, count in type_counts.items():
-            if count <= 0:
-                continue
-            difficulty = difficulty_map.get(qtype, 3)
-            qs = self.get_questions(
-                student_id, qtype, level, int(difficulty), count, grade
-            )
+        wanted = {
+            qtype: (int(difficulty_map.get(qtype, 3)), count)
+            for qtype, count in type_counts.items()
+            if count > 0
+        }
+        # One query for every type; only types the pool can't cover go
+        # through get_questions, which generates more
+        pooled = self.db.get_unseen_questions_by_types(student_id, level, wanted)
+        for qtype, (difficulty, count) in wanted.items():
+            qs = pooled[qtype]
+            if len(qs) < count:
+                qs = self.get_questions(
+                    student_id, qtype, level, difficulty, count, grade
+                )
             questions.extend(qs)
 
         return questions
 
+    def _generate_for_type(self, qtype: str, level: str, grade: int) -> List[Question]:
+        """One default-sized generation call for ``qtype`` (runs in a worker)."""
+        if qtype == "reading_comprehension":
+            return self.generator.generate_reading_comprehension(
+                level=level, grade=grade, difficulty=3,
+                num_passages=3, questions_per_passage=4,
+            )
+        return self.generator.generate_questions(
+            question_type=qtype, level=level, grade=grade,
+            difficulty=3, count=config.QUESTIONS_PER_BATCH,
+        )
+
+    def _generate_concurrently(self, types: List[str], level: str, grade: int):
+        """Yield (qtype, questions or QuestionGenerationError) as each type's
+        generation finishes. API calls run in parallel; the caller dedupes and
+        saves on its own thread, which owns the database connection."""
+        if not types:
+            return
+        workers = min(config.GENERATION_WORKERS, len(types))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(self._generate_for_type, qtype, level, grade): qtype
+                for qtype in types
+            }
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result()
+                except QuestionGenerationError as e:
+                    yield futures[future], e
+
     def check_and_replenish(self, student_id: int, level: str, grade: int = 4) -> None:
         """Check all pools and generate if any are below threshold."""
         types = LEVEL_TYPES.get(level, ALL_QUESTION_TYPES)
 
+        unseen = self.db.count_unseen_questions_by_type(student_id, level)
+        low = []
         for qtype in types:
-            unseen = self.db.count_unseen_questions(student_id, qtype, level)
-            if unseen < config.MIN_POOL_SIZE:
+            if unseen.get(qtype, 0) < config.MIN_POOL_SIZE:
                 self._on_status(f"Generating more {qtype} questions...", "info")
-                try:
-                    if qtype == "reading_comprehension":
-                        new_qs = self.generator.generate_reading_comprehension(
-                            level=level, grade=grade, difficulty=3,
-                            num_passages=3, questions_per_passage=4,
-                        )
-                    else:
-                        new_qs = self.generator.generate_questions(
-                            question_type=qtype, level=level, grade=grade,
-                            difficulty=3, count=config.QUESTIONS_PER_BATCH,
-                        )
-                    new_qs = self._deduplicate(new_qs)
-                    if new_qs:
-                        self.db.save_questions(new_qs)
-                except QuestionGenerationError as e:
-                    self._on_status(f"Failed to replenish {qtype}: {e}", "warning")
+                low.append(qtype)
+
+        for qtype, new_qs in self._generate_concurrently(low, level, grade):
+            if isinstance(new_qs, QuestionGenerationError):
+                self._on_status(f"Failed to replenish {qtype}: {new_qs}", "warning")
+                continue
+            new_qs = self._deduplicate(new_qs)
+            if new_qs:
+                self._save(new_qs)
 
     def generate_batch(self, level: str, grade: int) -> Dict[str, int]:
         """Generate a batch of questions. Returns {type: count_generated}."""
@@ -180,53 +222,46 @@ class QuestionCache:
 
         for qtype in types:
             self._on_status(f"Generating {qtype} questions...", "info")
-            try:
-                if qtype == "reading_comprehension":
-                    new_qs = self.generator.generate_reading_comprehension(
-                        level=level, grade=grade, difficulty=3,
-                        num_passages=3, questions_per_passage=4,
-                    )
-                else:
-                    new_qs = self.generator.generate_questions(
-                        question_type=qtype, level=level, grade=grade,
-                        difficulty=3, count=config.QUESTIONS_PER_BATCH,
-                    )
-                new_qs = self._deduplicate(new_qs)
-                if new_qs:
-                    self.db.save_questions(new_qs)
-                results[qtype] = len(new_qs)
-                self._on_status(f"{qtype}: {len(new_qs)} generated", "success")
-            except QuestionGenerationError as e:
+        for qtype, new_qs in self._generate_concurrently(types, level, grade):
+            if isinstance(new_qs, QuestionGenerationError):
                 results[qtype] = 0
-                self._on_status(f"{qtype}: failed ({e})", "error")
+                self._on_status(f"{qtype}: failed ({new_qs})", "error")
+                continue
+            new_qs = self._deduplicate(new_qs)
+            if new_qs:
+                self._save(new_qs)
+            results[qtype] = len(new_qs)
+            self._on_status(f"{qtype}: {len(new_qs)} generated", "success")
 
-        return results
+        return {qtype: results[qtype] for qtype in types}
 
     def get_pool_stats(self, student_id: int, level: str) -> Dict[str, int]:
         """Return count of unseen questions per type."""
         types = LEVEL_TYPES.get(level, ALL_QUESTION_TYPES)
-        stats = {}
-        for qtype in types:
-            stats[qtype] = self.db.count_unseen_questions(student_id, qtype, level)
-        return stats
+        unseen = self.db.count_unseen_questions_by_type(student_id, level)
+        return {qtype: unseen.get(qtype, 0) for qtype in types}
+
+    def _save(self, questions: List[Question]) -> None:
+        self.db.save_questions(questions)
+        self._saved_stem_keys.update(_stem_key(q.stem) for q in questions)
 
     def _deduplicate(self, questions: List[Question]) -> List[Question]:
         """Remove questions with duplicate stems (normalized), both within
         the batch and against questions already in the database."""
-        # Load existing stems from DB to avoid regenerating the same questions
-        existing_stems = set()
+        keys = [_stem_key(q.stem) for q in questions]
+        # Only stems this process hasn't saved need the database check
+        unknown = [q.stem for q, k in zip(questions, keys) if k not in self._saved_stem_keys]
         try:
-            stems = self.db.get_all_stems()
-            for s in stems:
-                existing_stems.add(s.strip().lower())
+            existing = self.db.find_existing_stems(unknown)
         except Exception:
-            pass
+            existing = set()
 
-        seen_stems = set(existing_stems)
+        seen = set()
         unique = []
-        for q in questions:
-            normalized = q.stem.strip().lower()
-            if normalized not in seen_stems:
-                seen_stems.add(normalized)
+        for q, key in zip(questions, keys):
+            if key in seen or key in self._saved_stem_keys:
+                continue
+            if q.stem not in existing:
+                seen.add(key)
                 unique.append(q)
         return unique
@@ -1,6 +1,7 @@
 """Claude API integration for SSAT question generation and writing feedback."""
 
 import json
+import threading
 import time
 import uuid
 from typing import Dict, List, Optional
@@ -28,12 +29,17 @@ class QuestionGenerator:
                 pass
         self.client = anthropic.Anthropic(api_key=api_key)
         self._last_request_time: float = 0
+        self._rate_lock = threading.Lock()
 
     def _rate_limit(self) -> None:
-        elapsed = time.time() - self._last_request_time
-        if elapsed < config.RATE_LIMIT_SECONDS:
-            time.sleep(config.RATE_LIMIT_SECONDS - elapsed)
-        self._last_request_time = time.time()
+        # Reserve the next start slot under the lock, then sleep outside it,
+        # so concurrent callers are spaced out but their requests overlap
+        with self._rate_lock:
+            now = time.time()
+            start = max(now, self._last_request_time + config.RATE_LIMIT_SECONDS)
+            self._last_request_time = start
+        if start > now:
+            time.sleep(start - now)
 
     # ------------------------------------------------------------------
     # Public API
@@ -0,0 +1,147 @@
+"""Response caches for Claude calls made by the AI agent functions."""
+
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency — caching is skipped without it
+    np = None
+
+
+class SemanticCache:
+    """In-memory cache of Claude responses keyed by prompt embedding.
+
+    A prompt whose embedding has cosine similarity >= threshold with a cached
+    prompt returns the cached response instead of making an API call. Entries
+    expire after ``ttl_seconds``; once ``max_entries`` is reached the least
+    recently used entry is evicted.
+
+    Embeddings come from a local sentence-transformers model. If numpy or
+    sentence-transformers is not installed, every lookup falls through to the
+    API call.
+    """
+
+    def __init__(self, model_name: str, ttl_seconds: float, max_entries: int):
+        self.model_name = model_name
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._model = None
+        self._available = np is not None
+        self._lock = threading.Lock()
+        self._embeddings = None  # (n, dim) float32 matrix of unit vectors
+        self._responses: List[str] = []
+        self._created: List[float] = []
+        self._last_used: List[float] = []
+
+    def _embed(self, text: str):
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+            self._model = SentenceTransformer(self.model_name)
+        emb = self._model.encode(text, normalize_embeddings=True)
+        return np.asarray(emb, dtype=np.float32)
+
+    def _keep(self, indices: List[int]) -> None:
+        self._embeddings = self._embeddings[indices] if indices else None
+        self._responses = [self._responses[i] for i in indices]
+        self._created = [self._created[i] for i in indices]
+        self._last_used = [self._last_used[i] for i in indices]
+
+    def _expire(self, now: float) -> None:
+        if self._embeddings is None:
+            return
+        live = [i for i, ts in enumerate(self._created) if now - ts < self.ttl_seconds]
+        if len(live) != len(self._created):
+            self._keep(live)
+
+    def _lookup(self, emb, threshold: float, now: float) -> Optional[str]:
+        self._expire(now)
+        if self._embeddings is None:
+            return None
+        # Rows and query are unit vectors, so the dot product is the cosine
+        sims = self._embeddings @ emb
+        best = int(np.argmax(sims))
+        if sims[best] < threshold:
+            return None
+        self._last_used[best] = now
+        return self._responses[best]
+
+    def _store(self, emb, response: str, now: float) -> None:
+        if len(self._responses) >= self.max_entries:
+            lru = min(range(len(self._last_used)), key=self._last_used.__getitem__)
+            self._keep([i for i in range(len(self._responses)) if i != lru])
+        row = emb[np.newaxis, :]
+        self._embeddings = row if self._embeddings is None else np.vstack([self._embeddings, row])
+        self._responses.append(response)
+        self._created.append(now)
+        self._last_used.append(now)
+
+    def get_or_call(self, text: str, threshold: float, call: Callable[[], str]) -> str:
+        """Return a cached response similar to ``text``, or run ``call`` and cache it."""
+        if not self._available:
+            return call()
+        try:
+            emb = self._embed(text)
+        except Exception:
+            # Embedding model unavailable — don't let caching break the call
+            self._available = False
+            return call()
+
+        with self._lock:
+            cached = self._lookup(emb, threshold, time.time())
+        if cached is not None:
+            return cached
+
+        response = call()
+        with self._lock:
+            self._store(emb, response, time.time())
+        return response
+
+
+class PromptCache:
+    """On-disk cache of Claude responses keyed by an exact prompt hash.
+
+    Catches deterministic repeats (same student, unchanged stats) with a
+    single file lookup and no embedding work. Each entry is a small JSON file
+    named by the SHA-256 key; entries older than ``ttl_seconds`` are ignored.
+    """
+
+    def __init__(self, cache_dir: Path, ttl_seconds: float):
+        self.cache_dir = Path(cache_dir)
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model: str, system_prompt: str, user_prompt: str, max_tokens: int) -> str:
+        payload = json.dumps(
+            {"m": model, "s": system_prompt, "u": user_prompt, "t": max_tokens},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        path = self.cache_dir / f"{key}.json"
+        try:
+            entry = json.loads(path.read_text())
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        if time.time() - entry.get("ts", 0) >= self.ttl_seconds:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry.get("text")
+
+    def set(self, key: str, text: str) -> None:
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            (self.cache_dir / f"{key}.json").write_text(
+                json.dumps({"ts": time.time(), "text": text})
+            )
+        except OSError:
+            pass  # read-only filesystem etc. — caching is best-effort
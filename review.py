@@ -95,7 +95,7 @@ class ReviewManager:
         table.add_column("Errors", justify="right", style="wrong")
 
         for i, (topic, count) in enumerate(sorted_topics, 1):
-            display_name = config.QUESTION_TYPE_DISPLAY.get(topic, topic.title())
+            display_name = config.display_name(topic)
             table.add_row(str(i), display_name, str(count))
 
         display.console.print(table)
@@ -159,7 +159,6 @@ class ReviewManager:
             level=self.student.level,
             grade=self.student.grade,
             mode="review",
-            started_at=datetime.now().isoformat(),
         )
         session = self.db.create_session(session)
 
@@ -193,7 +192,6 @@ class ReviewManager:
                 selected_answer=selected,
                 is_correct=is_correct if selected else False,
                 time_spent_seconds=q_elapsed,
-                answered_at=datetime.now().isoformat(),
             )
             self.db.save_answer(answer)
 
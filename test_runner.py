@@ -50,7 +50,6 @@ class TestRunner:
             level=self.student.level,
             grade=self.student.grade,
             mode="full_test",
-            started_at=datetime.now().isoformat(),
         )
         session = self.db.create_session(session)
 
@@ -153,7 +152,6 @@ class TestRunner:
             level=self.student.level,
             grade=self.student.grade,
             mode="section_practice",
-            started_at=datetime.now().isoformat(),
         )
         session = self.db.create_session(session)
 
@@ -213,7 +211,7 @@ class TestRunner:
             types = DRILL_TOPICS[cat_name]
 
             if len(types) > 1:
-                type_options = [config.QUESTION_TYPE_DISPLAY.get(t, t.title()) for t in types]
+                type_options = [config.display_name(t) for t in types]
                 type_options.append("Mix all")
                 type_choice = display.show_menu(f"{cat_name} Topics", type_options)
 
@@ -246,7 +244,6 @@ class TestRunner:
             level=self.student.level,
             grade=self.student.grade,
             mode="quick_drill",
-            started_at=datetime.now().isoformat(),
         )
         session = self.db.create_session(session)
 
@@ -302,18 +299,17 @@ class TestRunner:
             answers, self.student.level
         )
 
-        # Save answers
+        # Save answers and close the session in one transaction
         for a in answers:
             a.session_id = session.id
-            self.db.save_answer(a)
-
-        # Update session
         session.completed_at = datetime.now().isoformat()
-        self.db.update_session(session)
+        with self.db.transaction():
+            self.db.save_answers(answers)
+            self.db.update_session(session)
 
         # Show summary
         topic_name = ", ".join(
-            config.QUESTION_TYPE_DISPLAY.get(t, t.title()) for t in selected_types
+            config.display_name(t) for t in selected_types
         )
         display.show_drill_summary(correct, len(questions), topic_name, elapsed)
 
@@ -428,7 +424,7 @@ class TestRunner:
         # Save answers
         for a in answers:
             a.session_id = session.id
-            self.db.save_answer(a)
+        self.db.save_answers(answers)
 
         total_time = sum(a.time_spent_seconds for a in answers)
 
@@ -48,8 +48,14 @@ if "db" not in st.session_state:
         st.error("Database not configured. Please set SUPABASE_DB_URL in your secrets.")
         st.stop()
     try:
-        db = Database(db_url)
+        db = Database(
+            db_url,
+            prepare_statements=config.DB_PREPARE_STATEMENTS,
+            async_commit=config.DB_ASYNC_COMMIT,
+        )
         db.initialize()
+        if config.DB_DEBUG_EXPLAIN:
+            db.check_query_plans()
         st.session_state.db = db
     except Exception as e:
         st.error(f"Database connection failed: {e}")
@@ -214,12 +220,16 @@ def check_and_award_badges(extra_stats: Optional[Dict] = None):
             "accuracy": acc,
         }
 
+    # Finishing a drill can move every base stat; mini test keys only
+    # change when the caller supplies them
+    changed_keys = {"total_answers", "streak", "total_changed_answers", "topic_accuracy"}
     if extra_stats:
         stats.update(extra_stats)
+        changed_keys.update(extra_stats)
 
     existing = db.get_badges(student.id)
     existing_names = [b["badge_name"] for b in existing]
-    new_badges = check_new_badges(stats, existing_names)
+    new_badges = check_new_badges(stats, existing_names, changed_keys)
 
     for badge in new_badges:
         db.save_badge(student.id, badge.name, badge.description, badge.icon)
@@ -312,7 +322,7 @@ def score_current_section() -> SectionResult:
 
     for a in answers:
         a.session_id = session.id
-        db.save_answer(a)
+    db.save_answers(answers)
 
     total_time = sum(a.time_spent_seconds for a in answers)
 
@@ -458,13 +468,21 @@ def page_home():
     col_coach, col_spacer = st.columns([1, 2])
     with col_coach:
         if st.button("Get My Study Plan", type="primary", key="study_coach_btn"):
-            from agents import run_study_coach
+            from agents import STREAM_RESET, stream_study_coach
+            live = st.empty()
             with st.spinner("Your coach is analyzing your practice data..."):
                 try:
-                    recommendation = run_study_coach(get_db(), s)
+                    recommendation = ""
+                    for chunk in stream_study_coach(get_db(), s):
+                        if chunk == STREAM_RESET:
+                            recommendation = ""
+                        else:
+                            recommendation += chunk
+                        live.markdown(recommendation)
                     st.session_state.study_coach_result = recommendation
                 except Exception as e:
                     st.error(f"Study coach encountered an error: {e}")
+            live.empty()
 
     if "study_coach_result" in st.session_state:
         st.markdown(st.session_state.study_coach_result)
@@ -519,7 +537,7 @@ def _drill_setup():
     else:
         topic_options = DRILL_TOPICS[cat]
         if len(topic_options) > 1:
-            display_options = [QUESTION_TYPE_DISPLAY.get(t, t.title()) for t in topic_options] + ["Mix all"]
+            display_options = [config.display_name(t) for t in topic_options] + ["Mix all"]
             picked = st.selectbox("Topic", display_options)
             if picked == "Mix all":
                 selected_types = topic_options
@@ -556,7 +574,7 @@ def _drill_setup():
 
         session = TestSession(
             student_id=student.id, level=student.level, grade=student.grade,
-            mode="quick_drill", started_at=datetime.now().isoformat(),
+            mode="quick_drill",
         )
         session = get_db().create_session(session)
 
@@ -747,7 +765,7 @@ def _mini_setup():
 
         session = TestSession(
             student_id=student.id, level=student.level, grade=student.grade,
-            mode="mini_test", started_at=datetime.now().isoformat(),
+            mode="mini_test",
         )
         session = get_db().create_session(session)
 
@@ -814,13 +832,12 @@ def _mini_complete():
 
     raw, correct, wrong, skipped = calculate_raw_score(answers, student.level)
 
-    # Save answers to DB
+    # Save answers and close the session in one transaction
     db = get_db()
-    for a in answers:
-        db.save_answer(a)
-
     session.completed_at = datetime.now().isoformat()
-    db.update_session(session)
+    with db.transaction():
+        db.save_answers(answers)
+        db.update_session(session)
 
     # Update mastery
     try:
@@ -866,7 +883,7 @@ def _mini_complete():
     if breakdown:
         st.subheader("Topic Breakdown")
         for topic, stats in breakdown.items():
-            display_name = QUESTION_TYPE_DISPLAY.get(topic, topic.title())
+            display_name = config.display_name(topic)
             acc = stats["accuracy"]
             bar = "=" * int(acc * 20)
             st.text(f"{display_name:<25} {stats['correct']}/{stats['total']}  ({acc:.0%})  [{bar}]")
@@ -931,7 +948,7 @@ def _fulltest_setup():
     if st.button("Begin Test", type="primary"):
         session = TestSession(
             student_id=student.id, level=student.level, grade=student.grade,
-            mode="full_test", started_at=datetime.now().isoformat(),
+            mode="full_test",
         )
         session = get_db().create_session(session)
 
@@ -1104,7 +1121,7 @@ def _fulltest_complete():
         st.subheader("Topic Breakdown")
         for topic, data in sorted(topic_breakdown.items()):
             acc = data.get("accuracy", 0)
-            name = QUESTION_TYPE_DISPLAY.get(topic, topic.title())
+            name = config.display_name(topic)
             if acc >= 0.85:
                 st.success(f"**{name}**: {acc:.0%}")
             elif acc >= 0.60:
@@ -1156,7 +1173,7 @@ def _section_setup():
     if st.button("Start Section", type="primary"):
         session = TestSession(
             student_id=student.id, level=student.level, grade=student.grade,
-            mode="section_practice", started_at=datetime.now().isoformat(),
+            mode="section_practice",
         )
         session = get_db().create_session(session)
 
@@ -1240,18 +1257,13 @@ def page_review():
                         st.caption(f"Explanation: {question.explanation}")
 
     with tab2:
-        wrong_all = db.get_wrong_answers_for_student(student.id, limit=200)
-        if not wrong_all:
+        topic_errors = db.count_wrong_answers_by_type(student.id, limit=200)
+        if not topic_errors:
             st.success("No mistakes to analyze!")
         else:
-            topic_errors: Dict[str, int] = {}
-            for answer, question in wrong_all:
-                topic = question.question_type
-                topic_errors[topic] = topic_errors.get(topic, 0) + 1
-
             import pandas as pd
             df = pd.DataFrame([
-                {"Topic": QUESTION_TYPE_DISPLAY.get(t, t.title()), "Errors": c}
+                {"Topic": config.display_name(t), "Errors": c}
                 for t, c in sorted(topic_errors.items(), key=lambda x: -x[1])
             ])
             st.bar_chart(df.set_index("Topic"))
@@ -1392,10 +1404,11 @@ def page_progress():
     st.header(f"Progress Report — {student.name}")
     st.caption(f"Grade {student.grade} | {student.level.title()} Level")
 
-    stats = db.get_student_stats(student.id)
-    sessions = db.get_sessions_for_student(student.id, limit=50)
-    mastery = db.get_topic_mastery(student.id)
-    streak = db.get_streak_data(student.id)
+    bundle = db.get_dashboard_bundle(student.id, session_limit=50)
+    stats = bundle["stats"]
+    sessions = bundle["sessions"]
+    mastery = bundle["mastery"]
+    streak = bundle["streak"]
 
     # ── Overview Cards ──
     cols = st.columns(5)
@@ -1497,7 +1510,7 @@ def page_progress():
             topic_rows = []
             for topic, data in sorted(topic_agg.items(), key=lambda x: -x[1]["total"]):
                 acc = round(data["correct"] / data["total"] * 100) if data["total"] > 0 else 0
-                name = QUESTION_TYPE_DISPLAY.get(topic, topic.title())
+                name = config.display_name(topic)
                 topic_rows.append({
                     "Topic": name,
                     "Total Questions": data["total"],
@@ -1512,7 +1525,7 @@ def page_progress():
             topic_daily = {}
             for entry in daily_by_topic:
                 day = entry["day"]
-                topic = QUESTION_TYPE_DISPLAY.get(entry["topic"], entry["topic"].title())
+                topic = config.display_name(entry["topic"])
                 if day not in topic_daily:
                     topic_daily[day] = {}
                 if entry["total"] > 0:
@@ -1583,7 +1596,7 @@ def page_progress():
             st.subheader("All Topics")
             for m in sorted_mastery:
                 acc = m.total_correct / m.total_attempted
-                name = QUESTION_TYPE_DISPLAY.get(m.topic_tag, m.topic_tag.title())
+                name = config.display_name(m.topic_tag)
                 col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
                 with col1:
                     st.progress(acc, text=f"**{name}** — {acc:.0%}")
@@ -1603,8 +1616,8 @@ def page_progress():
             if len(sorted_mastery) >= 2:
                 best = sorted_mastery[0]
                 worst = sorted_mastery[-1]
-                best_name = QUESTION_TYPE_DISPLAY.get(best.topic_tag, best.topic_tag.title())
-                worst_name = QUESTION_TYPE_DISPLAY.get(worst.topic_tag, worst.topic_tag.title())
+                best_name = config.display_name(best.topic_tag)
+                worst_name = config.display_name(worst.topic_tag)
                 best_acc = best.total_correct / best.total_attempted
                 worst_acc = worst.total_correct / worst.total_attempted
 
@@ -1792,7 +1805,7 @@ def page_settings():
         cache = get_cache()
         pool_stats = cache.get_pool_stats(student.id, student.level)
         for qtype, count in sorted(pool_stats.items()):
-            name = QUESTION_TYPE_DISPLAY.get(qtype, qtype.title())
+            name = config.display_name(qtype)
             if count >= 10:
                 st.success(f"**{name}**: {count} available")
             elif count >= 5: